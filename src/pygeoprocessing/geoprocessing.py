@@ -10,12 +10,15 @@ from builtins import range
 import logging
 import os
 import shutil
+import copy
 import functools
 import math
 import heapq
+import bisect
 import time
 import tempfile
 import uuid
+import xml.sax.saxutils
 import distutils.version
 import multiprocessing
 import multiprocessing.pool
@@ -53,9 +56,31 @@ import scipy.sparse
 import scipy.signal
 import scipy.ndimage
 import scipy.signal.signaltools
+try:
+    # scipy >= 1.4 has a faster pocketfft based FFT than older numpy
+    import scipy.fft
+    _FFT = scipy.fft
+    _FFT_THREADS_KEYWORD = 'workers'
+except ImportError:
+    _FFT = numpy.fft
+    # numpy.fft can only run single threaded
+    _FFT_THREADS_KEYWORD = None
+try:
+    # FFTW is faster still when it's installed. Nothing is configured here
+    # so importing this module doesn't change pyfftw for anyone else, the
+    # convolution workers turn on its plan cache after they've started.
+    import pyfftw.interfaces.cache
+    import pyfftw.interfaces.numpy_fft
+    _FFT = pyfftw.interfaces.numpy_fft
+    _FFT_THREADS_KEYWORD = 'threads'
+    _HAS_PYFFTW = True
+except ImportError:
+    _HAS_PYFFTW = False
+import shapely
 import shapely.wkt
 import shapely.ops
 import shapely.prepared
+import shapely.strtree
 from . import geoprocessing_core
 
 from functools import reduce
@@ -72,6 +97,57 @@ except ImportError:
 
 _LOGGING_PERIOD = 5.0  # min 5.0 seconds per update log message for the module
 _LARGEST_ITERBLOCK = 2**16  # largest block for iterblocks to read in cells
+# largest span of integer keys reclassify_raster will build a lookup table for
+_MAX_DENSE_LOOKUP_SIZE = 2**20
+# fewest sparse integer keys for reclassify_raster to use a hash table for
+_MIN_HASH_LOOKUP_SIZE = 2**10
+# bytes of kernel block FFTs all of convolve_2d's workers keep together
+_MAX_KERNEL_FFT_CACHE_BYTES = 2**30
+# most keys reclassify_raster will hand to a GDAL VRT lookup table
+_MAX_VRT_LUT_SIZE = 4
+_GDAL_INTEGER_TYPES = (
+    gdal.GDT_Byte, gdal.GDT_Int16, gdal.GDT_UInt16, gdal.GDT_Int32,
+    gdal.GDT_UInt32)
+# bytes of working memory gdal.Warp may use per chunk; GDAL's default of
+# 64MB makes the multithreaded warper split large rasters into many chunks
+_WARP_MEMORY_LIMIT = 2**29
+
+# Coordinate transformations are expensive to construct since PROJ has to
+# resolve a pipeline between the two references, so they're kept here keyed
+# by (base wkt, target wkt). An OGRCoordinateTransformation isn't safe to use
+# from two threads at once, so each thread keeps its own in a `cache` dict.
+_COORDINATE_TRANSFORMATION_CACHE = threading.local()
+_MAX_COORDINATE_TRANSFORMATION_CACHE_SIZE = 64
+
+# get_raster_info results keyed by the raster's absolute path. Each entry
+# holds the raster's file list and their signature when it was read so
+# repeated queries on an unchanged raster don't reopen it.
+_RASTER_INFO_CACHE = {}
+_MAX_RASTER_INFO_CACHE_SIZE = 256
+
+# calculate_disjoint_polygon_set results keyed by the vector's absolute path
+# and layer index. Each entry holds the vector's file list and their
+# signature so repeated calls on an unchanged vector skip the overlap search.
+_DISJOINT_POLYGON_SET_CACHE = {}
+_MAX_DISJOINT_POLYGON_SET_CACHE_SIZE = 16
+
+# sorted 5-smooth numbers below 2**31 so _next_regular can bisect for FFT
+# sizes rather than search for them
+_REGULAR_NUMBER_LIST = sorted(
+    2**p2 * 3**p3 * 5**p5
+    for p2 in range(31) for p3 in range(20) for p5 in range(14)
+    if 2**p2 * 3**p3 * 5**p5 < 2**31)
+
+# numpy equivalents of GDAL types for _gdal_to_numpy_type, doesn't include
+# GDT_Byte because that's a special case
+_BASE_GDAL_TYPE_TO_NUMPY = {
+    gdal.GDT_Int16: numpy.int16,
+    gdal.GDT_Int32: numpy.int32,
+    gdal.GDT_UInt16: numpy.uint16,
+    gdal.GDT_UInt32: numpy.uint32,
+    gdal.GDT_Float32: numpy.float32,
+    gdal.GDT_Float64: numpy.float64,
+}
 
 # A dictionary to map the resampling method input string to the gdal type
 _RESAMPLE_DICT = {
@@ -96,6 +172,11 @@ if (distutils.version.LooseVersion(gdal.__version__) >=
         'q3': gdal.GRA_Q3,
     })
 
+# Shapely 2.0 STRtrees can query many geometries against a predicate at once.
+_SHAPELY_BULK_QUERY = (
+    distutils.version.LooseVersion(shapely.__version__) >=
+    distutils.version.LooseVersion('2.0'))
+
 
 def raster_calculator(
         base_raster_path_band_const_list, local_op, target_raster_path,
@@ -700,42 +781,84 @@ def calculate_raster_stats(raster_path):
     raster = gdal.OpenEx(raster_path, gdal.GA_Update)
     raster_properties = get_raster_info(raster_path)
     for band_index in range(raster.RasterCount):
+        # GDAL calculates exact statistics in a single pass, respects the
+        # band's nodata value, and sets the result on the band. It reports a
+        # failure if it can't (for example if all pixels are nodata), in
+        # which case the band is scanned here instead.
+        target_band = raster.GetRasterBand(band_index+1)
+        gdal.PushErrorHandler('CPLQuietErrorHandler')
+        gdal.ErrorReset()
+        try:
+            target_band.ComputeStatistics(False)
+            gdal_stats_failed = gdal.GetLastErrorType() >= gdal.CE_Failure
+        except RuntimeError:
+            gdal_stats_failed = True
+        finally:
+            gdal.PopErrorHandler()
+        target_band = None
+        if not gdal_stats_failed:
+            continue
+
         target_min = None
         target_max = None
         target_n = 0
         target_sum = 0.0
-        for _, target_block in iterblocks(
+        nodata_target = raster_properties['nodata'][band_index]
+        # remember which blocks had valid pixels so the stdev pass can read
+        # them directly without rediscovering the block layout
+        valid_offset_list = []
+        for target_offset, target_block in iterblocks(
                 raster_path, band_index_list=[band_index+1]):
-            nodata_target = raster_properties['nodata'][band_index]
             # guard against an undefined nodata target
-            valid_mask = numpy.ones(target_block.shape, dtype=bool)
             if nodata_target is not None:
-                valid_mask[:] = target_block != nodata_target
-            valid_block = target_block[valid_mask]
+                valid_block = target_block[target_block != nodata_target]
+            else:
+                valid_block = target_block.ravel()
             if valid_block.size == 0:
                 continue
+            valid_offset_list.append(target_offset)
+            block_min = valid_block.min()
+            block_max = valid_block.max()
             if target_min is None:
                 # initialize first min/max
-                target_min = target_max = valid_block[0]
-            target_sum += numpy.sum(valid_block)
-            target_min = min(numpy.min(valid_block), target_min)
-            target_max = max(numpy.max(valid_block), target_max)
+                target_min = block_min
+                target_max = block_max
+            else:
+                if block_min < target_min:
+                    target_min = block_min
+                if block_max > target_max:
+                    target_max = block_max
+            target_sum += valid_block.sum()
             target_n += valid_block.size
 
         if target_min is not None:
             target_mean = target_sum / float(target_n)
+            # squared deviations are reduced per block as a float64 dot
+            # product of one deviation array rather than squared into a
+            # second temporary and summed
             stdev_sum = 0.0
-            for _, target_block in iterblocks(
-                    raster_path, band_index_list=[band_index+1]):
+            target_band = raster.GetRasterBand(band_index+1)
+            # read into a buffer of the type iterblocks used so a signed
+            # byte band has the same values in both passes; edge blocks use
+            # a view of its upper left corner
+            target_buffer = numpy.empty(
+                (max(offset['win_ysize'] for offset in valid_offset_list),
+                 max(offset['win_xsize'] for offset in valid_offset_list)),
+                dtype=_gdal_to_numpy_type(target_band))
+            for target_offset in valid_offset_list:
+                target_block = target_buffer[
+                    :target_offset['win_ysize'], :target_offset['win_xsize']]
+                target_band.ReadAsArray(buf_obj=target_block, **target_offset)
                 # guard against an undefined nodata target
-                valid_mask = numpy.ones(target_block.shape, dtype=bool)
                 if nodata_target is not None:
-                    valid_mask = target_block != nodata_target
-                valid_block = target_block[valid_mask]
-                stdev_sum += numpy.sum((valid_block - target_mean) ** 2)
+                    valid_block = target_block[target_block != nodata_target]
+                else:
+                    valid_block = target_block
+                deviation = valid_block.ravel().astype(numpy.float64)
+                deviation -= target_mean
+                stdev_sum += float(numpy.dot(deviation, deviation))
             target_stddev = (stdev_sum / float(target_n)) ** 0.5
 
-            target_band = raster.GetRasterBand(band_index+1)
             target_band.SetStatistics(
                 float(target_min), float(target_max), float(target_mean),
                 float(target_stddev))
@@ -860,12 +983,18 @@ def new_raster_from_base(
             # computation to hang. This block, though possibly slightly less
             # efficient than `band.Fill` will give real-time feedback about
             # how the fill is progressing.
+            # The fill value is constant, so a filled block is made once per
+            # distinct block shape (at most interior, right edge, bottom edge,
+            # and corner) and reused.
+            fill_array_cache = {}
             for offsets in iterblocks(target_path, offset_only=True):
-                fill_array = numpy.empty(
-                    (offsets['win_ysize'], offsets['win_xsize']))
+                block_shape = (offsets['win_ysize'], offsets['win_xsize'])
+                if block_shape not in fill_array_cache:
+                    fill_array_cache[block_shape] = numpy.empty(block_shape)
+                    fill_array_cache[block_shape][:] = fill_value
+                fill_array = fill_array_cache[block_shape]
                 pixels_processed += (
                     offsets['win_ysize'] * offsets['win_xsize'])
-                fill_array[:] = fill_value
                 target_band.WriteArray(
                     fill_array, offsets['xoff'], offsets['yoff'])
 
@@ -874,6 +1003,8 @@ def new_raster_from_base(
                         '%.2f%% complete',
                         float(pixels_processed) / n_pixels * 100.0),
                     _LOGGING_PERIOD)
+            fill_array = None
+            fill_array_cache = None
             target_band = None
     target_raster = None
 
@@ -913,24 +1044,22 @@ def create_raster_from_vector_extents(
     shp_extent = None
     for layer_index in range(vector.GetLayerCount()):
         layer = vector.GetLayer(layer_index)
-        for feature in layer:
-            try:
-                # envelope is [xmin, xmax, ymin, ymax]
-                feature_extent = feature.GetGeometryRef().GetEnvelope()
-                if shp_extent is None:
-                    shp_extent = list(feature_extent)
-                else:
-                    # expand bounds of current bounding box to include that
-                    # of the newest feature
-                    shp_extent = [
-                        f(shp_extent[index], feature_extent[index])
-                        for index, f in enumerate([min, max, min, max])]
-            except AttributeError as error:
-                # For some valid OGR objects the geometry can be undefined
-                # since it's valid to have a NULL entry in the attribute table
-                # this is expressed as a None value in the geometry reference
-                # this feature won't contribute
-                LOGGER.warn(error)
+        # OGR calculates the layer envelope in a single call and skips
+        # features with a NULL geometry. It's None for a layer without any
+        # geometries, which won't contribute.
+        # envelope is [xmin, xmax, ymin, ymax]
+        layer_extent = layer.GetExtent(force=1, can_return_null=True)
+        if layer_extent is None:
+            continue
+        if shp_extent is None:
+            shp_extent = list(layer_extent)
+        else:
+            # expand bounds of current bounding box to include that of the
+            # newest layer
+            shp_extent = [
+                f(shp_extent[index], layer_extent[index])
+                for index, f in enumerate([min, max, min, max])]
+        layer = None
 
     # round up on the rows and cols so that the target raster encloses the
     # base vector
@@ -997,41 +1126,74 @@ def interpolate_points(
 
     """
     source_vector = gdal.OpenEx(base_vector_path)
-    point_list = []
-    value_list = []
+    n_points = sum([
+        source_vector.GetLayer(layer_index).GetFeatureCount()
+        for layer_index in range(source_vector.GetLayerCount())])
+    # coordinates and values are filled into flat preallocated arrays rather
+    # than appended to lists of python pairs
+    y_array = numpy.empty(n_points, dtype=numpy.float64)
+    x_array = numpy.empty(n_points, dtype=numpy.float64)
+    value_array = numpy.empty(n_points, dtype=numpy.float64)
+    point_index = 0
     for layer_index in range(source_vector.GetLayerCount()):
         layer = source_vector.GetLayer(layer_index)
         for point_feature in layer:
-            value = point_feature.GetField(vector_attribute_field)
-            # Add in the numpy notation which is row, col
+            value_array[point_index] = point_feature.GetField(
+                vector_attribute_field)
             # Here the point geometry is in the form x, y (col, row)
-            geometry = point_feature.GetGeometryRef()
-            point = geometry.GetPoint()
-            point_list.append([point[1], point[0]])
-            value_list.append(value)
-
-    point_array = numpy.array(point_list)
-    value_array = numpy.array(value_list)
+            point = point_feature.GetGeometryRef().GetPoint()
+            y_array[point_index] = point[1]
+            x_array[point_index] = point[0]
+            point_index += 1
+        layer = None
+    source_vector = None
+
+    # Add in the numpy notation which is row, col
+    point_array = numpy.column_stack(
+        (y_array[:point_index], x_array[:point_index]))
+    value_array = value_array[:point_index]
 
     target_raster = gdal.OpenEx(target_raster_path_band[0], gdal.GA_Update)
     band = target_raster.GetRasterBand(target_raster_path_band[1])
     nodata = band.GetNoDataValue()
     geotransform = target_raster.GetGeoTransform()
+
+    # this is to be consistent with GDAL 2.0's change of 'nearest' to
+    # 'near' for an interpolation scheme that SciPy did not change.
+    if interpolation_mode == 'near':
+        interpolation_mode = 'nearest'
+    # `griddata` would rebuild its KD-tree or triangulation of the points on
+    # every block, so the equivalent interpolator is built once up front and
+    # evaluated per block.
+    if interpolation_mode == 'nearest':
+        interpolator = scipy.interpolate.NearestNDInterpolator(
+            point_array, value_array)
+    elif interpolation_mode == 'linear':
+        interpolator = scipy.interpolate.LinearNDInterpolator(
+            point_array, value_array, fill_value=nodata)
+    elif interpolation_mode == 'cubic':
+        interpolator = scipy.interpolate.CloughTocher2DInterpolator(
+            point_array, value_array, fill_value=nodata)
+    else:
+        raise ValueError(
+            "Unknown interpolation_mode '%s', expected one of 'linear', "
+            "'near', or 'cubic'" % interpolation_mode)
+
     for offsets in iterblocks(
             target_raster_path_band[0], offset_only=True):
-        grid_y, grid_x = numpy.mgrid[
-            offsets['yoff']:offsets['yoff']+offsets['win_ysize'],
-            offsets['xoff']:offsets['xoff']+offsets['win_xsize']]
-        grid_y = grid_y * geotransform[5] + geotransform[3]
-        grid_x = grid_x * geotransform[1] + geotransform[0]
-
-        # this is to be consistent with GDAL 2.0's change of 'nearest' to
-        # 'near' for an interpolation scheme that SciPy did not change.
-        if interpolation_mode == 'near':
-            interpolation_mode = 'nearest'
-        raster_out_array = scipy.interpolate.griddata(
-            point_array, value_array, (grid_y, grid_x), interpolation_mode,
-            nodata)
+        # build 1D row and column coordinates and let the interpolator
+        # broadcast them to the block rather than allocating full-block
+        # index grids
+        grid_y = (
+            numpy.arange(
+                offsets['yoff'], offsets['yoff']+offsets['win_ysize']) *
+            geotransform[5] + geotransform[3])[:, numpy.newaxis]
+        grid_x = (
+            numpy.arange(
+                offsets['xoff'], offsets['xoff']+offsets['win_xsize']) *
+            geotransform[1] + geotransform[0])[numpy.newaxis, :]
+
+        raster_out_array = interpolator(grid_y, grid_x)
         band.WriteArray(raster_out_array, offsets['xoff'], offsets['yoff'])
 
 
@@ -1126,6 +1288,14 @@ def zonal_statistics(
     raster_info = get_raster_info(base_raster_path_band[0])
     # -1 here because bands are 1 indexed
     raster_nodata = raster_info['nodata'][base_raster_path_band[1]-1]
+    # float nodata is matched with the same default tolerance as
+    # `numpy.isclose`, but that tolerance is computed once here rather than
+    # on every aggregate id in every block. Integer nodata is matched exactly.
+    if raster_nodata is not None and raster_info['datatype'] in (
+            gdal.GDT_Float32, gdal.GDT_Float64):
+        raster_nodata_tol = 1e-8 + 1e-5 * abs(raster_nodata)
+    else:
+        raster_nodata_tol = None
     with tempfile.NamedTemporaryFile(
             prefix='clipped_raster', delete=False,
             dir=working_dir) as clipped_raster_file:
@@ -1174,24 +1344,38 @@ def zonal_statistics(
         clipped_raster_path, aggregate_id_raster_path, gdal.GDT_Int32,
         [aggregate_id_nodata])
     aggregate_id_raster = gdal.OpenEx(aggregate_id_raster_path, gdal.GA_Update)
-    aggregate_stats = {}
+    # stats are accumulated in dense arrays indexed by local aggregate id;
+    # min/max arrays are allocated on the first block so they take the
+    # clipped raster's type
+    aggregate_min = None
+    aggregate_max = None
+    aggregate_count = numpy.zeros(aggregate_id_nodata, dtype=numpy.int64)
+    aggregate_nodata_count = numpy.zeros(
+        aggregate_id_nodata, dtype=numpy.int64)
+    aggregate_sum = numpy.zeros(aggregate_id_nodata, dtype=numpy.float64)
+
+    # the same layer is reused for every polygon set; its features are
+    # deleted after each set is rasterized rather than recreating the layer
+    disjoint_layer = disjoint_vector.CreateLayer(
+        'disjoint_vector', spat_ref, ogr.wkbPolygon)
+    disjoint_layer.CreateField(local_aggregate_field_def)
+    disjoint_layer_defn = disjoint_layer.GetLayerDefn()
 
     for polygon_set in minimal_polygon_sets:
-        disjoint_layer = disjoint_vector.CreateLayer(
-            'disjoint_vector', spat_ref, ogr.wkbPolygon)
-        disjoint_layer.CreateField(local_aggregate_field_def)
-        # add polygons to subset_layer
-        for index, poly_fid in enumerate(polygon_set):
+        if not polygon_set:
+            continue
+        # add polygons to subset_layer; each feature is built in memory with
+        # its local aggregate id and geometry so it's only written once
+        for poly_fid in polygon_set:
             poly_feat = aggregate_layer.GetFeature(poly_fid)
-            disjoint_layer.CreateFeature(poly_feat)
-            # we seem to need to reload the feature and set the index because
-            # just copying over the feature left indexes as all 0s.  Not sure
-            # why.
-            new_feat = disjoint_layer.GetFeature(index)
+            new_feat = ogr.Feature(disjoint_layer_defn)
             new_feat.SetField(
                 local_aggregate_field_name, base_to_local_aggregate_value[
                     poly_feat.GetField(aggregate_field_name)])
-            disjoint_layer.SetFeature(new_feat)
+            new_feat.SetGeometry(poly_feat.GetGeometryRef())
+            disjoint_layer.CreateFeature(new_feat)
+            new_feat = None
+            poly_feat = None
         disjoint_layer.SyncToDisk()
 
         # nodata out the mask
@@ -1204,62 +1388,99 @@ def zonal_statistics(
         aggregate_id_raster.FlushCache()
 
         # Delete the features we just added to the subset_layer
-        disjoint_layer = None
-        disjoint_vector.DeleteLayer(0)
+        disjoint_layer.ResetReading()
+        for disjoint_fid in [feat.GetFID() for feat in disjoint_layer]:
+            disjoint_layer.DeleteFeature(disjoint_fid)
+        disjoint_layer.SyncToDisk()
 
         # create a key array
         # and parallel min, max, count, and nodata count arrays
         for aggregate_id_offsets, aggregate_id_block in iterblocks(
                 aggregate_id_raster_path):
+            # `aggregate_id_nodata` is always defined since it's set above
+            # as one past the largest local aggregate id
+            valid_mask = aggregate_id_block != aggregate_id_nodata
+            if not valid_mask.any():
+                # no polygon covers this block so there's nothing to
+                # aggregate and no need to read the clipped raster
+                continue
             clipped_block = clipped_band.ReadAsArray(**aggregate_id_offsets)
-            # guard against a None nodata type
-            valid_mask = numpy.ones(aggregate_id_block.shape, dtype=bool)
-            if aggregate_id_nodata is not None:
-                valid_mask[:] = aggregate_id_block != aggregate_id_nodata
             valid_aggregate_id = aggregate_id_block[valid_mask]
             valid_clipped = clipped_block[valid_mask]
-            for aggregate_id in numpy.unique(valid_aggregate_id):
-                aggregate_mask = valid_aggregate_id == aggregate_id
-                masked_clipped_block = valid_clipped[aggregate_mask]
-                clipped_nodata_mask = numpy.isclose(
-                    masked_clipped_block, raster_nodata)
-                if aggregate_id not in aggregate_stats:
-                    aggregate_stats[aggregate_id] = {
-                        'min': None,
-                        'max': None,
-                        'count': 0,
-                        'nodata_count': 0,
-                        'sum': 0.0
-                    }
-                aggregate_stats[aggregate_id]['nodata_count'] += (
-                    numpy.count_nonzero(clipped_nodata_mask))
-                if ignore_nodata:
-                    masked_clipped_block = (
-                        masked_clipped_block[~clipped_nodata_mask])
-                if masked_clipped_block.size == 0:
-                    continue
-
-                if aggregate_stats[aggregate_id]['min'] is None:
-                    aggregate_stats[aggregate_id]['min'] = (
-                        masked_clipped_block[0])
-                    aggregate_stats[aggregate_id]['max'] = (
-                        masked_clipped_block[0])
-
-                aggregate_stats[aggregate_id]['min'] = min(
-                    numpy.min(masked_clipped_block),
-                    aggregate_stats[aggregate_id]['min'])
-                aggregate_stats[aggregate_id]['max'] = max(
-                    numpy.max(masked_clipped_block),
-                    aggregate_stats[aggregate_id]['max'])
-                aggregate_stats[aggregate_id]['count'] += (
-                    masked_clipped_block.size)
-                aggregate_stats[aggregate_id]['sum'] += numpy.sum(
-                    masked_clipped_block)
+            if raster_nodata is None:
+                clipped_nodata_mask = numpy.zeros(
+                    valid_clipped.shape, dtype=bool)
+            elif raster_nodata_tol is None:
+                clipped_nodata_mask = valid_clipped == raster_nodata
+            else:
+                clipped_nodata_mask = numpy.abs(
+                    valid_clipped - raster_nodata) <= raster_nodata_tol
+
+            # every aggregate id in the block is reduced at once rather than
+            # masking the whole block again for each unique id. The ids are
+            # numbered compactly within the block first so the work scales
+            # with the ids in the block, not with every id in the vector
+            block_aggregate_id, compact_id = numpy.unique(
+                valid_aggregate_id, return_inverse=True)
+            n_block_ids = block_aggregate_id.size
+            block_nodata_count = numpy.bincount(
+                compact_id[clipped_nodata_mask], minlength=n_block_ids)
+            if ignore_nodata:
+                # invert the mask in place once rather than allocating a new
+                # inverted mask for each array it's applied to
+                clipped_valid_mask = numpy.logical_not(
+                    clipped_nodata_mask, out=clipped_nodata_mask)
+                compact_id = compact_id[clipped_valid_mask]
+                valid_clipped = valid_clipped[clipped_valid_mask]
+            block_count = numpy.bincount(compact_id, minlength=n_block_ids)
+            block_sum = numpy.bincount(
+                compact_id, weights=valid_clipped, minlength=n_block_ids)
+            block_min = numpy.empty(n_block_ids, dtype=valid_clipped.dtype)
+            block_max = numpy.empty(n_block_ids, dtype=valid_clipped.dtype)
+            if compact_id.size > 0:
+                # sorting by id makes each id's pixels a contiguous run so
+                # min and max are a single `reduceat` over all runs
+                sort_order = numpy.argsort(compact_id, kind='mergesort')
+                sorted_compact_id = compact_id[sort_order]
+                sorted_clipped = valid_clipped[sort_order]
+                run_start_index = numpy.flatnonzero(numpy.concatenate((
+                    [True],
+                    sorted_compact_id[1:] != sorted_compact_id[:-1])))
+                run_compact_id = sorted_compact_id[run_start_index]
+                block_min[run_compact_id] = numpy.minimum.reduceat(
+                    sorted_clipped, run_start_index)
+                block_max[run_compact_id] = numpy.maximum.reduceat(
+                    sorted_clipped, run_start_index)
+
+            if aggregate_min is None:
+                aggregate_min = numpy.empty(
+                    aggregate_id_nodata, dtype=valid_clipped.dtype)
+                aggregate_max = numpy.empty(
+                    aggregate_id_nodata, dtype=valid_clipped.dtype)
+            # only the ids in this block are touched in the running results
+            block_valid = block_count > 0
+            valid_block_id = block_aggregate_id[block_valid]
+            valid_block_min = block_min[block_valid]
+            valid_block_max = block_max[block_valid]
+            first_valid = aggregate_count[valid_block_id] == 0
+            previous_min = aggregate_min[valid_block_id]
+            previous_max = aggregate_max[valid_block_id]
+            previous_min[first_valid] = valid_block_min[first_valid]
+            previous_max[first_valid] = valid_block_max[first_valid]
+            aggregate_min[valid_block_id] = numpy.minimum(
+                previous_min, valid_block_min)
+            aggregate_max[valid_block_id] = numpy.maximum(
+                previous_max, valid_block_max)
+            # ids are unique within a block so these don't need `add.at`
+            aggregate_count[block_aggregate_id] += block_count
+            aggregate_nodata_count[block_aggregate_id] += block_nodata_count
+            aggregate_sum[block_aggregate_id] += block_sum
 
     # clean up temporary files
     clipped_band = None
     clipped_raster = None
     aggregate_id_raster = None
+    disjoint_layer_defn = None
     disjoint_layer = None
     disjoint_vector = None
     for filename in [aggregate_id_raster_path, clipped_raster_path]:
@@ -1271,9 +1492,19 @@ def zonal_statistics(
         value: key for key, value in
         base_to_local_aggregate_value.items()}
 
-    return {
-        local_to_base_aggregate_value[key]: value
-        for key, value in aggregate_stats.items()}
+    # only ids that covered at least one pixel are reported
+    aggregate_stats = {}
+    for aggregate_id in numpy.flatnonzero(
+            aggregate_count + aggregate_nodata_count):
+        has_value = aggregate_count[aggregate_id] > 0
+        aggregate_stats[local_to_base_aggregate_value[aggregate_id]] = {
+            'min': aggregate_min[aggregate_id] if has_value else None,
+            'max': aggregate_max[aggregate_id] if has_value else None,
+            'count': int(aggregate_count[aggregate_id]),
+            'nodata_count': int(aggregate_nodata_count[aggregate_id]),
+            'sum': float(aggregate_sum[aggregate_id]),
+        }
+    return aggregate_stats
 
 
 def get_vector_info(vector_path, layer_index=0):
@@ -1354,10 +1585,21 @@ def get_raster_info(raster_path):
     """
     if not os.path.exists(raster_path):
         raise ValueError("%s does not exist." % raster_path)
+    cache_key = os.path.abspath(raster_path)
+    if cache_key in _RASTER_INFO_CACHE:
+        file_list, file_signature, cached_properties = (
+            _RASTER_INFO_CACHE[cache_key])
+        if _get_file_signature(file_list) == file_signature:
+            # copied so callers can't modify the cached result
+            return copy.deepcopy(cached_properties)
     raster = gdal.OpenEx(raster_path, gdal.OF_RASTER)
     if not raster:
         raise ValueError(
             "Could not open %s as a gdal.OF_RASTER" % raster_path)
+    # signed before anything is read so a write during the read leaves a
+    # stale signature that forces the next call to read again
+    file_list = _get_dataset_file_list(raster, raster_path)
+    file_signature = _get_file_signature(file_list)
     raster_properties = {}
     raster_properties['projection'] = raster.GetProjection()
     geo_transform = raster.GetGeoTransform()
@@ -1365,15 +1607,16 @@ def get_raster_info(raster_path):
     raster_properties['pixel_size'] = (geo_transform[1], geo_transform[5])
     raster_properties['mean_pixel_size'] = (
         (abs(geo_transform[1]) + abs(geo_transform[5])) / 2.0)
-    raster_properties['raster_size'] = (
-        raster.GetRasterBand(1).XSize,
-        raster.GetRasterBand(1).YSize)
     raster_properties['n_bands'] = raster.RasterCount
-    raster_properties['nodata'] = [
-        raster.GetRasterBand(index).GetNoDataValue() for index in range(
+    band_list = [
+        raster.GetRasterBand(index) for index in range(
             1, raster_properties['n_bands']+1)]
+    raster_properties['raster_size'] = (
+        band_list[0].XSize, band_list[0].YSize)
+    raster_properties['nodata'] = [
+        band.GetNoDataValue() for band in band_list]
     # blocksize is the same for all bands, so we can just get the first
-    raster_properties['block_size'] = raster.GetRasterBand(1).GetBlockSize()
+    raster_properties['block_size'] = band_list[0].GetBlockSize()
 
     # we dont' really know how the geotransform is laid out, all we can do is
     # calculate the x and y bounds, then take the appropriate min/max
@@ -1391,8 +1634,14 @@ def get_raster_info(raster_path):
         numpy.max(x_bounds), numpy.max(y_bounds)]
 
     # datatype is the same for the whole raster, but is associated with band
-    raster_properties['datatype'] = raster.GetRasterBand(1).DataType
+    raster_properties['datatype'] = band_list[0].DataType
+    band_list = None
     raster = None
+
+    if len(_RASTER_INFO_CACHE) >= _MAX_RASTER_INFO_CACHE_SIZE:
+        _RASTER_INFO_CACHE.clear()
+    _RASTER_INFO_CACHE[cache_key] = (
+        file_list, file_signature, copy.deepcopy(raster_properties))
     return raster_properties
 
 
@@ -1418,84 +1667,42 @@ def reproject_vector(
         None
 
     """
-    base_vector = gdal.OpenEx(base_vector_path)
-
     # if this file already exists, then remove it
     if os.path.isfile(target_path):
         LOGGER.warn(
             "%s already exists, removing and overwriting", target_path)
         os.remove(target_path)
 
-    target_sr = osr.SpatialReference(target_wkt)
-
-    # create a new shapefile from the orginal_datasource
-    target_driver = ogr.GetDriverByName(driver_name)
-    target_vector = target_driver.CreateDataSource(target_path)
+    if not hasattr(gdal, 'VectorTranslate'):
+        # `gdal.VectorTranslate` was added in GDAL 2.1
+        _reproject_vector_by_feature(
+            base_vector_path, target_wkt, target_path, layer_index,
+            driver_name)
+        return
 
+    base_vector = gdal.OpenEx(base_vector_path, gdal.OF_VECTOR)
     layer = base_vector.GetLayer(layer_index)
-    layer_dfn = layer.GetLayerDefn()
-
-    # Create new layer for target_vector using same name and
-    # geometry type from base vector but new projection
-    target_layer = target_vector.CreateLayer(
-        layer_dfn.GetName(), target_sr, layer_dfn.GetGeomType())
-
-    # Get the number of fields in original_layer
-    original_field_count = layer_dfn.GetFieldCount()
-
-    # For every field, create a duplicate field in the new layer
-    for fld_index in range(original_field_count):
-        original_field = layer_dfn.GetFieldDefn(fld_index)
-        target_field = ogr.FieldDefn(
-            original_field.GetName(), original_field.GetType())
-        target_layer.CreateField(target_field)
-
-    # Get the SR of the original_layer to use in transforming
-    base_sr = layer.GetSpatialRef()
-
-    # Create a coordinate transformation
-    coord_trans = osr.CoordinateTransformation(base_sr, target_sr)
-
-    # Copy all of the features in layer to the new shapefile
-    error_count = 0
-    for base_feature in layer:
-        geom = base_feature.GetGeometryRef()
-        if geom is None:
-            # we encountered this error occasionally when transforming clipped
-            # global polygons.  Not clear what is happening but perhaps a
-            # feature was retained that otherwise wouldn't have been included
-            # in the clip
-            error_count += 1
-            continue
-
-        # Transform geometry into format desired for the new projection
-        error_code = geom.Transform(coord_trans)
-        if error_code != 0:  # error
-            # this could be caused by an out of range transformation
-            # whatever the case, don't put the transformed poly into the
-            # output set
-            error_count += 1
-            continue
-
-        # Copy original_datasource's feature and set as new shapes feature
-        target_feature = ogr.Feature(target_layer.GetLayerDefn())
-        target_feature.SetGeometry(geom)
-
-        # For all the fields in the feature set the field values from the
-        # source field
-        for fld_index in range(target_feature.GetFieldCount()):
-            target_feature.SetField(
-                fld_index, base_feature.GetField(fld_index))
+    layer_name = layer.GetName()
+    base_feature_count = layer.GetFeatureCount()
+    layer = None
 
-        target_layer.CreateFeature(target_feature)
-        target_feature = None
-        base_feature = None
+    # GDAL copies the fields, transforms the geometries, and writes the
+    # features in C++ rather than crossing into python for every feature.
+    # Features whose geometry fails to transform are skipped.
+    reproject_callback = _make_logger_callback(
+        "reproject_vector %.1f%% complete %s")
+    target_vector = gdal.VectorTranslate(
+        target_path, base_vector, format=driver_name, dstSRS=target_wkt,
+        reproject=True, layers=[layer_name], skipFailures=True,
+        callback=reproject_callback, callback_data=[target_path])
+    error_count = (
+        base_feature_count - target_vector.GetLayer(0).GetFeatureCount())
     if error_count > 0:
         LOGGER.warn(
             '%d features out of %d were unable to be transformed and are'
             ' not in the output vector at %s', error_count,
-            layer.GetFeatureCount(), target_path)
-    layer = None
+            base_feature_count, target_path)
+    target_vector = None
     base_vector = None
 
 
@@ -1545,23 +1752,74 @@ def reclassify_raster(
     # otherwise if nodata not predefined, remap it into the dictionary
     if nodata is not None and nodata not in value_map_copy:
         value_map_copy[nodata] = target_nodata
-    keys = sorted(numpy.array(list(value_map_copy.keys())))
+    keys = numpy.array(sorted(value_map_copy.keys()))
     values = numpy.array([value_map_copy[x] for x in keys])
 
+    # A small integer to integer map with no values required is done by
+    # GDAL reading through a VRT lookup table with no Python per block.
+    if (not values_required and
+            keys.size <= _MAX_VRT_LUT_SIZE and
+            raster_info['datatype'] in _GDAL_INTEGER_TYPES and
+            target_datatype in _GDAL_INTEGER_TYPES and
+            _is_integral_array(keys) and _is_integral_array(values)):
+        _reclassify_raster_by_lut(
+            base_raster_path_band, keys, values, target_raster_path,
+            target_datatype, target_nodata)
+        return
+
+    # When an integer raster is reclassified by integer keys over a small
+    # span, a table indexed by pixel value replaces the binary search per
+    # pixel with one lookup. Each entry holds exactly what `numpy.digitize`
+    # would have chosen for that value, so results are identical. Many
+    # integer keys over a larger span are looked up in a hash table.
+    dense_lookup = None
+    hash_lookup = None
+    if (raster_info['datatype'] in _GDAL_INTEGER_TYPES and
+            _is_integral_array(keys) and
+            int(keys[0]) >= numpy.iinfo(numpy.int64).min and
+            int(keys[-1]) <= numpy.iinfo(numpy.int64).max):
+        if int(keys[-1]) - int(keys[0]) < _MAX_DENSE_LOOKUP_SIZE:
+            dense_lookup_offset = int(keys[0])
+            dense_lookup_keys = numpy.arange(
+                dense_lookup_offset, int(keys[-1]) + 1, dtype=numpy.int64)
+            dense_lookup = values[
+                numpy.searchsorted(keys, dense_lookup_keys, side='left')]
+            dense_has_key = numpy.in1d(dense_lookup_keys, keys)
+        elif keys.size >= _MIN_HASH_LOOKUP_SIZE:
+            hash_lookup = geoprocessing_core.IntKeyLookup(
+                keys.astype(numpy.int64))
+
     def _map_dataset_to_value_op(original_values):
         """Convert a block of original values to the lookup values."""
+        if dense_lookup is not None:
+            lookup_index = original_values.astype(numpy.int64)
+            lookup_index -= dense_lookup_offset
+            # values outside of the table fall through to the general case
+            if (lookup_index.min() >= 0 and
+                    lookup_index.max() < dense_lookup.size and (
+                        not values_required or
+                        dense_has_key[lookup_index].all())):
+                return dense_lookup[lookup_index]
+        elif hash_lookup is not None:
+            lookup_index = hash_lookup.lookup(
+                original_values.astype(numpy.int64).ravel())
+            # values that aren't keys fall through to the general case
+            if lookup_index.min() >= 0:
+                return values[lookup_index].reshape(original_values.shape)
+        # a left-sided binary search is what `numpy.digitize` does with
+        # `right=True` on increasing keys, without digitize's overhead
+        index = numpy.searchsorted(keys, original_values, side='left')
         if values_required:
-            unique = numpy.unique(original_values)
-            has_map = numpy.in1d(unique, keys)
-            if not all(has_map):
-                missing_values = unique[~has_map]
+            has_map = (
+                keys[numpy.minimum(index, keys.size-1)] == original_values)
+            if not has_map.all():
+                missing_values = numpy.unique(original_values[~has_map])
                 raise ValueError(
                     'The following %d raster values %s from "%s" do not have '
                     'corresponding entries in the `value_map`: %s' % (
                         missing_values.size, str(missing_values),
                         base_raster_path_band[0], str(value_map)))
-        index = numpy.digitize(original_values.ravel(), keys, right=True)
-        return values[index].reshape(original_values.shape)
+        return values[index]
 
     raster_calculator(
         [base_raster_path_band], _map_dataset_to_value_op,
@@ -1664,6 +1922,7 @@ def warp_raster(
         dstSRS=target_sr_wkt,
         multithread=True,
         warpOptions=['NUM_THREADS=ALL_CPUS'],
+        warpMemoryLimit=_WARP_MEMORY_LIMIT,
         creationOptions=gtiff_creation_options,
         callback=reproject_callback,
         callback_data=[target_raster_path])
@@ -1758,7 +2017,20 @@ def calculate_disjoint_polygon_set(vector_path, layer_index=0):
         subset_list (list): list of sets of FIDs from vector_path
 
     """
+    cache_key = None
+    if os.path.exists(vector_path):
+        cache_key = (os.path.abspath(vector_path), layer_index)
+        if cache_key in _DISJOINT_POLYGON_SET_CACHE:
+            file_list, file_signature, cached_subset_list = (
+                _DISJOINT_POLYGON_SET_CACHE[cache_key])
+            if _get_file_signature(file_list) == file_signature:
+                return copy.deepcopy(cached_subset_list)
+
     vector = gdal.OpenEx(vector_path)
+    if cache_key is not None:
+        # signed before any features are read, as in get_raster_info
+        file_list = _get_dataset_file_list(vector, vector_path)
+        file_signature = _get_file_signature(file_list)
     vector_layer = vector.GetLayer(layer_index)
 
     poly_intersect_lookup = {}
@@ -1774,44 +2046,72 @@ def calculate_disjoint_polygon_set(vector_path, layer_index=0):
     vector_layer = None
     vector = None
 
-    for poly_fid in poly_intersect_lookup:
-        polygon = shapely.prepared.prep(
-            poly_intersect_lookup[poly_fid]['poly'])
-        for intersect_poly_fid in poly_intersect_lookup:
-            if intersect_poly_fid == poly_fid or polygon.intersects(
-                    poly_intersect_lookup[intersect_poly_fid]['poly']):
-                poly_intersect_lookup[poly_fid]['intersects'].add(
-                    intersect_poly_fid)
-        polygon = None
+    # index the polygons by bounding box so each polygon is only tested
+    # against the candidates whose envelopes it overlaps
+    poly_fid_list = list(poly_intersect_lookup)
+    poly_list = [
+        poly_intersect_lookup[poly_fid]['poly'] for poly_fid in poly_fid_list]
+    # an empty layer has no polygons to index, and shapely 2's bulk query
+    # rejects an empty geometry list
+    if poly_list:
+        poly_rtree = shapely.strtree.STRtree(poly_list)
+        for poly_fid in poly_fid_list:
+            poly_intersect_lookup[poly_fid]['intersects'].add(poly_fid)
+        if _SHAPELY_BULK_QUERY:
+            # all intersecting (polygon, polygon) index pairs in one query
+            poly_index_array, intersect_index_array = poly_rtree.query(
+                poly_list, predicate='intersects')
+            for poly_index, intersect_index in zip(
+                    poly_index_array.tolist(), intersect_index_array.tolist()):
+                poly_intersect_lookup[poly_fid_list[poly_index]][
+                    'intersects'].add(poly_fid_list[intersect_index])
+        else:
+            poly_id_to_fid = dict(
+                (id(poly), poly_fid) for poly, poly_fid in zip(
+                    poly_list, poly_fid_list))
+            for poly_fid, poly in zip(poly_fid_list, poly_list):
+                polygon = shapely.prepared.prep(poly)
+                intersect_set = poly_intersect_lookup[poly_fid]['intersects']
+                for candidate in poly_rtree.query(poly):
+                    if polygon.intersects(candidate):
+                        intersect_set.add(poly_id_to_fid[id(candidate)])
+                polygon = None
+        poly_rtree = None
+
+    # sort polygons by increasing number of intersections once, each pass
+    # then filters the polygons that are still left in that order
+    heap = [
+        (len(poly_dict['intersects']), poly_fid)
+        for poly_fid, poly_dict in poly_intersect_lookup.items()]
+    heapq.heapify(heap)
+    remaining_fid_list = [
+        heapq.heappop(heap)[1] for _ in range(len(heap))]
+    heap = None
 
     # Build maximal subsets
     subset_list = []
-    while len(poly_intersect_lookup) > 0:
-        # sort polygons by increasing number of intersections
-        heap = []
-        for poly_fid, poly_dict in poly_intersect_lookup.items():
-            heapq.heappush(
-                heap, (len(poly_dict['intersects']), poly_fid, poly_dict))
-
+    while len(remaining_fid_list) > 0:
         # build maximal subset
         maximal_set = set()
-        while len(heap) > 0:
-            _, poly_fid, poly_dict = heapq.heappop(heap)
-            for maxset_fid in maximal_set:
-                if maxset_fid in poly_intersect_lookup[poly_fid]['intersects']:
-                    # it intersects and can't be part of the maximal subset
-                    break
-            else:
+        next_remaining_fid_list = []
+        for poly_fid in remaining_fid_list:
+            if poly_intersect_lookup[poly_fid]['intersects'].isdisjoint(
+                    maximal_set):
                 # made it through without an intersection, add poly_fid to
                 # the maximal set
                 maximal_set.add(poly_fid)
-                # remove that polygon and update the intersections
-                del poly_intersect_lookup[poly_fid]
-        # remove all the polygons from intersections once they're computed
-        for maxset_fid in maximal_set:
-            for poly_dict in poly_intersect_lookup.values():
-                poly_dict['intersects'].discard(maxset_fid)
+            else:
+                # it intersects and can't be part of the maximal subset
+                next_remaining_fid_list.append(poly_fid)
+        remaining_fid_list = next_remaining_fid_list
         subset_list.append(maximal_set)
+
+    if cache_key is not None:
+        if (len(_DISJOINT_POLYGON_SET_CACHE) >=
+                _MAX_DISJOINT_POLYGON_SET_CACHE_SIZE):
+            _DISJOINT_POLYGON_SET_CACHE.clear()
+        _DISJOINT_POLYGON_SET_CACHE[cache_key] = (
+            file_list, file_signature, copy.deepcopy(subset_list))
     return subset_list
 
 
@@ -1847,8 +2147,10 @@ def distance_transform_edt(
 
     def mask_op(base_array):
         """Convert base_array to 1 if >0, 0 if == 0 or nodata."""
-        return numpy.where(
-            base_array == nodata, nodata_out, base_array != 0)
+        result = (base_array != 0).view(numpy.uint8)
+        if nodata is not None:
+            result[base_array == nodata] = nodata_out
+        return result
 
     raster_calculator(
         [base_mask_raster_path_band], mask_op,
@@ -1886,6 +2188,10 @@ def _next_regular(base):
     if base <= 6:
         return base
 
+    if base <= _REGULAR_NUMBER_LIST[-1]:
+        return _REGULAR_NUMBER_LIST[
+            bisect.bisect_left(_REGULAR_NUMBER_LIST, base)]
+
     # Quickly check if it's already a power of 2
     if not (base & (base-1)):
         return base
@@ -2020,21 +2326,52 @@ def convolve_2d(
     LOGGER.info('starting convolve')
     last_time = time.time()
 
-    # calculate the kernel sum for normalization
-    kernel_nodata = kernel_raster_info['nodata'][0]
-    kernel_sum = 0.0
-    for _, kernel_block in iterblocks(kernel_path_band[0]):
-        if kernel_nodata is not None and ignore_nodata:
-            kernel_block[numpy.isclose(kernel_block, kernel_nodata)] = 0.0
-        kernel_sum += numpy.sum(kernel_block)
-
-    n_workers = max(multiprocessing.cpu_count(), 1)
+    # the kernel sum is only needed to normalize the kernel or to rescale
+    # the nodata-normalized result, so skip the pass over the kernel if not
+    kernel_sum = None
+    if normalize_kernel or (s_nodata is not None and ignore_nodata):
+        kernel_sum = _calculate_kernel_sum(kernel_path_band, ignore_nodata)
+
+    signal_offset_list = list(
+        iterblocks(s_path_band[0], offset_only=True))
+    kernel_offset_list = list(
+        iterblocks(k_path_band[0], offset_only=True))
+
+    # there's no use for more workers than signal blocks, any cores left
+    # over are given to each worker's FFTs instead
+    n_cpus = max(multiprocessing.cpu_count(), 1)
+    n_workers = min(n_cpus, len(signal_offset_list))
+    n_fft_threads = n_cpus // n_workers
+    kernel_fft_cache_bytes = _MAX_KERNEL_FFT_CACHE_BYTES // n_workers
+
+    # results are passed back from the workers through a fixed pool of
+    # shared memory slots so the arrays don't get pickled through a pipe,
+    # the queues only carry the slot index and where to write it
+    n_slots = n_workers * 2
+    max_result_size = (
+        (max(offset['win_xsize'] for offset in signal_offset_list) +
+         max(offset['win_xsize'] for offset in kernel_offset_list) - 1) *
+        (max(offset['win_ysize'] for offset in signal_offset_list) +
+         max(offset['win_ysize'] for offset in kernel_offset_list) - 1))
+    result_slot_list = [
+        multiprocessing.RawArray('d', max_result_size)
+        for _ in range(n_slots)]
+    mask_slot_list = None
+    if s_nodata is not None and ignore_nodata:
+        mask_slot_list = [
+            multiprocessing.RawArray('d', max_result_size)
+            for _ in range(n_slots)]
+    free_slot_queue = multiprocessing.Queue()
+    for slot_index in range(n_slots):
+        free_slot_queue.put(slot_index)
 
     # limit the size of the write queue so we don't accidentally load a whole
     # array into memory, work queue is okay because it's only passing block
-    # indexes
+    # indexes. Workers only read the signal and kernel, this process is the
+    # single writer of the target and mask rasters so GDAL datasets are never
+    # written concurrently.
     work_queue = multiprocessing.Queue()
-    write_queue = multiprocessing.Queue(n_workers * 2)
+    write_queue = multiprocessing.Queue(n_slots)
 
     worker_list = []
     for worker_id in range(n_workers):
@@ -2042,57 +2379,74 @@ def convolve_2d(
             target=_convolve_2d_worker,
             args=(
                 signal_path_band, kernel_path_band,
-                ignore_nodata, normalize_kernel,
-                work_queue, write_queue))
+                ignore_nodata, normalize_kernel, kernel_sum,
+                kernel_offset_list, n_fft_threads, kernel_fft_cache_bytes,
+                work_queue, write_queue, free_slot_queue, result_slot_list,
+                mask_slot_list))
         worker.daemon = True
         worker.start()
         worker_list.append(worker)
 
-    n_blocks = 0
-    for signal_offset in iterblocks(s_path_band[0], offset_only=True):
-        for kernel_offset in iterblocks(k_path_band[0], offset_only=True):
-            work_queue.put((signal_offset, kernel_offset))
-            n_blocks += 1
+    n_blocks = len(signal_offset_list) * len(kernel_offset_list)
+    for signal_offset in signal_offset_list:
+        work_queue.put(signal_offset)
     for _ in range(n_workers):
         # signal end to worker
         work_queue.put(None)
 
+    # the writer's output and nodata mask arrays are views on the front of
+    # these so they aren't reallocated for every block
+    output_buffer = numpy.empty(max_result_size, dtype=numpy.float32)
+    nodata_mask_buffer = numpy.empty(max_result_size, dtype=numpy.bool_)
+    signal_nodata_is_nan = s_nodata is not None and numpy.isnan(s_nodata)
+
+    # constant parts of the progress message
+    target_basename = os.path.basename(target_path)
+    percent_per_block = 100.0 / n_blocks
+
     # used to count how many workers are still running
     n_active_workers = n_workers
     n_blocks_processed = 0
     while True:
         write_payload = write_queue.get()
         if write_payload:
-            (index_dict, result, mask_result,
-             left_index_raster, right_index_raster,
-             top_index_raster, bottom_index_raster,
-             left_index_result, right_index_result,
-             top_index_result, bottom_index_result) = write_payload
+            index_dict, slot_index = write_payload
         else:
             n_active_workers -= 1
             if n_active_workers == 0:
                 break
             continue
 
-        # read the current so we can add to it
+        result_shape = (index_dict['win_ysize'], index_dict['win_xsize'])
+        result = _shared_slot_as_array(
+            result_slot_list[slot_index], result_shape)
+        if mask_slot_list is not None:
+            mask_result = _shared_slot_as_array(
+                mask_slot_list[slot_index], result_shape)
+
+        # add the result to the current output in a single pass; the sum
+        # is calculated in float64 and stored as float32 as it always was
+        n_result_pixels = result_shape[0] * result_shape[1]
         current_output = target_band.ReadAsArray(**index_dict)
-        # read the signal block so we know where the nodata are
-        potential_nodata_signal_array = signal_band.ReadAsArray(
-            **index_dict)
-        output_array = numpy.empty(
-            current_output.shape, dtype=numpy.float32)
-
-        valid_mask = numpy.ones(
-            potential_nodata_signal_array.shape, dtype=bool)
-        # guard against a None nodata value
-        if base_signal_nodata is not None and mask_nodata:
-            valid_mask[:] = (
-                potential_nodata_signal_array != base_signal_nodata)
-        output_array[:] = target_nodata
-        output_array[valid_mask] = (
-            (result[top_index_result:bottom_index_result,
-                    left_index_result:right_index_result])[valid_mask] +
-            current_output[valid_mask])
+        output_array = numpy.add(
+            result, current_output,
+            out=output_buffer[:n_result_pixels].reshape(result_shape),
+            casting='unsafe')
+
+        # only read the signal block if its nodata pixels need masking
+        nodata_mask = None
+        if s_nodata is not None and mask_nodata:
+            nodata_mask = nodata_mask_buffer[:n_result_pixels].reshape(
+                result_shape)
+            if signal_nodata_is_nan:
+                # NaN never compares equal, so test for it directly
+                numpy.isnan(
+                    signal_band.ReadAsArray(**index_dict), out=nodata_mask)
+            else:
+                numpy.equal(
+                    signal_band.ReadAsArray(**index_dict), s_nodata,
+                    out=nodata_mask)
+            numpy.copyto(output_array, target_nodata, where=nodata_mask)
 
         target_band.WriteArray(
             output_array, xoff=index_dict['xoff'],
@@ -2102,26 +2456,29 @@ def convolve_2d(
             # we'll need to save off the mask convolution so we can divide
             # it in total later
             current_mask = mask_band.ReadAsArray(**index_dict)
-            output_array[valid_mask] = (
-                (mask_result[
-                    top_index_result:bottom_index_result,
-                    left_index_result:right_index_result])[valid_mask] +
-                current_mask[valid_mask])
+            numpy.add(
+                mask_result, current_mask, out=output_array,
+                casting='unsafe')
+            if nodata_mask is not None:
+                numpy.copyto(output_array, target_nodata, where=nodata_mask)
             mask_band.WriteArray(
                 output_array, xoff=index_dict['xoff'],
                 yoff=index_dict['yoff'])
 
+        # the slot's contents have been written, let a worker reuse it
+        result = None
+        mask_result = None
+        free_slot_queue.put(slot_index)
+
         n_blocks_processed += 1
         last_time = _invoke_timed_callback(
             last_time, lambda: LOGGER.info(
                 "convolution worker approximately %.1f%% complete on %s",
-                100.0 * float(n_blocks_processed) / (n_blocks),
-                os.path.basename(target_path)),
+                n_blocks_processed * percent_per_block, target_basename),
             _LOGGING_PERIOD)
 
     LOGGER.info(
-        "convolution worker 100.0%% complete on %s",
-        os.path.basename(target_path))
+        "convolution worker 100.0%% complete on %s", target_basename)
 
     target_band.FlushCache()
     target_raster.FlushCache()
@@ -2131,21 +2488,29 @@ def convolve_2d(
         mask_pixels_processed = 0
         mask_band.FlushCache()
         mask_raster.FlushCache()
+        target_numpy_type = _gdal_type_to_numpy_lookup[target_datatype]
+        # nodata was written through a float32 buffer, so this is the exact
+        # value it was stored as and can be compared for equality
+        stored_target_nodata = numpy.array(
+            target_nodata, dtype=numpy.float32).astype(target_numpy_type)
         for target_data, target_block in iterblocks(
                 target_path, band_index_list=[1],
-                astype_list=[_gdal_type_to_numpy_lookup[target_datatype]]):
+                astype_list=[target_numpy_type]):
             mask_block = mask_band.ReadAsArray(**target_data)
             if base_signal_nodata is not None and mask_nodata:
-                valid_mask = ~numpy.isclose(target_block, target_nodata)
+                valid_mask = target_block != stored_target_nodata
             else:
-                valid_mask = numpy.ones(target_block.shape, dtype=numpy.bool)
+                valid_mask = True
             # divide the target_band by the mask_band
-            target_block[valid_mask] /= mask_block[valid_mask]
+            numpy.divide(
+                target_block, mask_block, out=target_block, where=valid_mask)
 
             # scale by kernel sum if necessary since mask division will
             # automatically normalize kernel
             if not normalize_kernel:
-                target_block[valid_mask] *= kernel_sum
+                numpy.multiply(
+                    target_block, kernel_sum, out=target_block,
+                    where=valid_mask)
 
             target_band.WriteArray(
                 target_block, xoff=target_data['xoff'],
@@ -2156,15 +2521,14 @@ def convolve_2d(
                 last_time, lambda: LOGGER.info(
                     "convolution nodata normalizer approximately %.1f%% "
                     "complete on %s", 100.0 * float(mask_pixels_processed) / (
-                        n_cols_signal * n_rows_signal),
-                    os.path.basename(target_path)),
+                        n_cols_signal * n_rows_signal), target_basename),
                 _LOGGING_PERIOD)
         # delete the mask raster
         gdal.Dataset.__swig_destroy__(mask_raster)
         os.remove(mask_raster_path)
         LOGGER.info(
             "convolution nodata normalize 100.0%% complete on %s",
-            os.path.basename(target_path))
+            target_basename)
 
     for worker in worker_list:
         worker.join(_MAX_TIMEOUT)
@@ -2222,6 +2586,9 @@ def iterblocks(
             data['win_xsize'] - The width of the block.
             data['win_ysize'] - The height of the block.
 
+        The arrays are reused from one iteration to the next, so copy them
+        if their contents are needed after the next iteration.
+
         If `offset_only` is True, the function returns only the block offset
             data and does not attempt to read binary data from the raster.
 
@@ -2259,16 +2626,19 @@ def iterblocks(
     n_col_blocks = int(math.ceil(n_cols / float(cols_per_block)))
     n_row_blocks = int(math.ceil(n_rows / float(rows_per_block)))
 
-    # Initialize to None so a block array is created on the first iteration
-    last_row_block_width = None
-    last_col_block_width = None
-
     if astype_list is not None:
         block_type_list = astype_list
     else:
         block_type_list = [
             _gdal_to_numpy_type(ds_band) for ds_band in band_index_list]
 
+    # one full sized buffer per band is read into for every block, edge
+    # blocks use a view of its upper left corner
+    if not offset_only:
+        raster_buffer_list = [
+            numpy.empty((rows_per_block, cols_per_block), dtype=block_type)
+            for block_type in block_type_list]
+
     for row_block_index in range(n_row_blocks):
         row_offset = row_block_index * rows_per_block
         row_block_width = n_rows - row_offset
@@ -2281,15 +2651,6 @@ def iterblocks(
             if col_block_width > cols_per_block:
                 col_block_width = cols_per_block
 
-            # resize the raster block cache if necessary
-            if (last_row_block_width != row_block_width or
-                    last_col_block_width != col_block_width):
-                raster_blocks = [
-                    numpy.zeros(
-                        (row_block_width, col_block_width),
-                        dtype=block_type) for block_type in
-                    block_type_list]
-
             offset_dict = {
                 'xoff': col_offset,
                 'yoff': row_offset,
@@ -2298,6 +2659,9 @@ def iterblocks(
             }
             result = offset_dict
             if not offset_only:
+                raster_blocks = [
+                    raster_buffer[:row_block_width, :col_block_width]
+                    for raster_buffer in raster_buffer_list]
                 for ds_band, block in zip(band_index_list, raster_blocks):
                     ds_band.ReadAsArray(buf_obj=block, **offset_dict)
                 result = (result,) + tuple(raster_blocks)
@@ -2336,26 +2700,13 @@ def transform_bounding_box(
         `new_epsg` coordinate system.
 
     """
-    base_ref = osr.SpatialReference()
-    base_ref.ImportFromWkt(base_ref_wkt)
-
-    target_ref = osr.SpatialReference()
-    target_ref.ImportFromWkt(target_ref_wkt)
-
-    transformer = osr.CoordinateTransformation(base_ref, target_ref)
-
-    def _transform_point(point):
-        """Transform an (x,y) point tuple from base_ref to target_ref."""
-        trans_x, trans_y, _ = (transformer.TransformPoint(*point))
-        return (trans_x, trans_y)
-
-    # The following list comprehension iterates over each edge of the bounding
-    # box, divides each edge into `edge_samples` number of points, then
-    # reduces that list to an appropriate `bounding_fn` given the edge.
-    # For example the left edge needs to be the minimum x coordinate so
-    # we generate `edge_samples` number of points between the upper left and
-    # lower left point, transform them all to the new coordinate system
-    # then get the minimum x coordinate "min(p[0] ...)" of the batch.
+    transformer = _get_coordinate_transformation(
+        base_ref_wkt, target_ref_wkt)
+
+    # The bounding box edges are each divided into `edge_samples` number of
+    # points and all of them are transformed to the new coordinate system in
+    # a single call. Each edge is then reduced with the appropriate bound,
+    # for example the left edge needs to be the minimum x coordinate.
     # points are numbered from 0 starting upper right as follows:
     # 0--3
     # |  |
@@ -2364,16 +2715,18 @@ def transform_bounding_box(
     p_1 = numpy.array((bounding_box[0], bounding_box[1]))
     p_2 = numpy.array((bounding_box[2], bounding_box[1]))
     p_3 = numpy.array((bounding_box[2], bounding_box[3]))
+    edge_weights = numpy.linspace(0, 1, edge_samples)[:, numpy.newaxis]
+    edge_points = numpy.vstack([
+        p_a * edge_weights + p_b * (1 - edge_weights)
+        for p_a, p_b in [(p_0, p_1), (p_1, p_2), (p_2, p_3), (p_3, p_0)]])
+    transformed_points = numpy.array(
+        transformer.TransformPoints(edge_points.tolist()))[:, :2].reshape(
+            (4, edge_samples, 2))
     transformed_bounding_box = [
-        bounding_fn(
-            [_transform_point(
-                p_a * v + p_b * (1 - v)) for v in numpy.linspace(
-                    0, 1, edge_samples)])
-        for p_a, p_b, bounding_fn in [
-            (p_0, p_1, lambda p_list: min([p[0] for p in p_list])),
-            (p_1, p_2, lambda p_list: min([p[1] for p in p_list])),
-            (p_2, p_3, lambda p_list: max([p[0] for p in p_list])),
-            (p_3, p_0, lambda p_list: max([p[1] for p in p_list]))]]
+        float(transformed_points[0, :, 0].min()),
+        float(transformed_points[1, :, 1].min()),
+        float(transformed_points[2, :, 0].max()),
+        float(transformed_points[3, :, 1].max())]
     return transformed_bounding_box
 
 
@@ -2450,16 +2803,20 @@ def merge_rasters(
                 [(path, x['projection']) for path, x in zip(
                     raster_path_list, raster_info_list)]))
 
-    pixeltype_set = set()
-    for path in raster_path_list:
-        raster = gdal.OpenEx(path, gdal.OF_RASTER)
-        band = raster.GetRasterBand(1)
-        metadata = band.GetMetadata('IMAGE_STRUCTURE')
-        band = None
-        if 'PIXELTYPE' in metadata:
-            pixeltype_set.add('PIXELTYPE=' + metadata['PIXELTYPE'])
-        else:
-            pixeltype_set.add(None)
+    # only Byte rasters can have a PIXELTYPE, so only open those to check
+    pixeltype_set = set([None])
+    if gdal.GDT_Byte in datatype_set:
+        pixeltype_set = set()
+        for path in raster_path_list:
+            raster = gdal.OpenEx(path, gdal.OF_RASTER)
+            band = raster.GetRasterBand(1)
+            metadata = band.GetMetadata('IMAGE_STRUCTURE')
+            band = None
+            raster = None
+            if 'PIXELTYPE' in metadata:
+                pixeltype_set.add('PIXELTYPE=' + metadata['PIXELTYPE'])
+            else:
+                pixeltype_set.add(None)
     if len(pixeltype_set) != 1:
         raise ValueError(
             "PIXELTYPE different between rasters."
@@ -2505,7 +2862,7 @@ def merge_rasters(
     target_raster = driver.Create(
         target_path, n_cols, n_rows, n_bands,
         datatype_set.pop(), options=gtiff_creation_options)
-    target_raster.SetProjection(raster.GetProjection())
+    target_raster.SetProjection(projection_set.pop())
     target_raster.SetGeoTransform(target_geotransform)
     if expected_nodata is None:
         nodata = nodata_set.pop()
@@ -2518,74 +2875,22 @@ def merge_rasters(
         target_raster.GetRasterBand(1).SetNoDataValue(nodata)
         for band_index in range(n_bands):
             target_raster.GetRasterBand(band_index+1).Fill(nodata)
-    target_band_list = [
-        target_raster.GetRasterBand(band_index) for band_index in range(
-            1, n_bands+1)]
-
-    # the raster was left over from checking pixel types, remove it after
-    raster = None
-
-    for raster_info, raster_path in zip(raster_info_list, raster_path_list):
-        # figure out where raster_path starts w/r/t target_raster
-        raster_start_x = int((
-            raster_info['geotransform'][0] -
-            target_geotransform[0]) / target_pixel_size[0])
-        raster_start_y = int((
-            raster_info['geotransform'][3] -
-            target_geotransform[3]) / target_pixel_size[1])
-        for iter_result in iterblocks(raster_path):
-            offset_info = iter_result[0]
-            # its possible the block reads in coverage that is outside the
-            # target bounds entirely. nothing to do but skip
-            if offset_info['yoff'] + raster_start_y > n_rows:
-                continue
-            if offset_info['xoff'] + raster_start_x > n_cols:
-                continue
-            if (offset_info['xoff'] + raster_start_x +
-                    offset_info['win_xsize'] < 0):
-                continue
-            if (offset_info['yoff'] + raster_start_y +
-                    offset_info['win_ysize'] < 0):
-                continue
 
-            # invariant: the window described in `offset_info` intersects
-            # with the target raster.
-
-            # check to see if window hangs off the left/top part of raster
-            # and determine how far to adjust down
-            x_clip_min = 0
-            if raster_start_x + offset_info['xoff'] < 0:
-                x_clip_min = abs(raster_start_x + offset_info['xoff'])
-            y_clip_min = 0
-            if raster_start_y + offset_info['yoff'] < 0:
-                y_clip_min = abs(raster_start_y + offset_info['yoff'])
-            x_clip_max = 0
-
-            # check if window hangs off right/bottom part of target raster
-            if (offset_info['xoff'] + raster_start_x +
-                    offset_info['win_xsize'] >= n_cols):
-                x_clip_max = (
-                    offset_info['xoff'] + raster_start_x +
-                    offset_info['win_xsize'] - n_cols)
-            y_clip_max = 0
-
-            if (offset_info['yoff'] + raster_start_y +
-                    offset_info['win_ysize'] >= n_rows):
-                y_clip_max = (
-                    offset_info['yoff'] + raster_start_y +
-                    offset_info['win_ysize'] - n_rows)
-
-            data_block_list = iter_result[1:]
-            for target_band, data_block in zip(
-                    target_band_list, data_block_list):
-                target_band.WriteArray(
-                    data_block[
-                        y_clip_min:offset_info['win_ysize']-y_clip_max,
-                        x_clip_min:offset_info['win_xsize']-x_clip_max],
-                    xoff=offset_info['xoff']+raster_start_x+x_clip_min,
-                    yoff=offset_info['yoff']+raster_start_y+y_clip_min)
+    # GDAL copies each raster into its window of the target, clipping at the
+    # target's edges, with later rasters overwriting earlier ones. Source
+    # nodata is ignored so every pixel is copied as it was before.
+    gdal.Warp(
+        target_raster, raster_path_list,
+        resampleAlg='near',
+        srcNodata='None',
+        multithread=True,
+        warpOptions=['NUM_THREADS=ALL_CPUS'],
+        warpMemoryLimit=_WARP_MEMORY_LIMIT,
+        callback=_make_logger_callback(
+            "merge_rasters %.1f%% complete %s"),
+        callback_data=[target_path])
 
-    del target_band_list[:]
+    target_raster.FlushCache()
     target_raster = None
 
 
@@ -2628,21 +2933,12 @@ def _gdal_to_numpy_type(band):
         numpy_datatype (numpy.dtype): equivalent of band.DataType
 
     """
-    # doesn't include GDT_Byte because that's a special case
-    base_gdal_type_to_numpy = {
-        gdal.GDT_Int16: numpy.int16,
-        gdal.GDT_Int32: numpy.int32,
-        gdal.GDT_UInt16: numpy.uint16,
-        gdal.GDT_UInt32: numpy.uint32,
-        gdal.GDT_Float32: numpy.float32,
-        gdal.GDT_Float64: numpy.float64,
-    }
+    band_datatype = band.DataType
+    if band_datatype in _BASE_GDAL_TYPE_TO_NUMPY:
+        return _BASE_GDAL_TYPE_TO_NUMPY[band_datatype]
 
-    if band.DataType in base_gdal_type_to_numpy:
-        return base_gdal_type_to_numpy[band.DataType]
-
-    if band.DataType != gdal.GDT_Byte:
-        raise ValueError("Unsupported DataType: %s" % str(band.DataType))
+    if band_datatype != gdal.GDT_Byte:
+        raise ValueError("Unsupported DataType: %s" % str(band_datatype))
 
     # band must be GDT_Byte type, check if it is signed/unsigned
     metadata = band.GetMetadata('IMAGE_STRUCTURE')
@@ -2663,23 +2959,17 @@ def _merge_bounding_boxes(bb1, bb2, mode):
         Reduced bounding box of bb1/bb2 depending on mode.
 
     """
-    def _less_than_or_equal(x_val, y_val):
-        return x_val if x_val <= y_val else y_val
-
-    def _greater_than(x_val, y_val):
-        return x_val if x_val > y_val else y_val
-
     if mode == "union":
-        comparison_ops = [
-            _less_than_or_equal, _less_than_or_equal,
-            _greater_than, _greater_than]
+        return [
+            min(bb1[0], bb2[0]), min(bb1[1], bb2[1]),
+            max(bb1[2], bb2[2]), max(bb1[3], bb2[3])]
     if mode == "intersection":
-        comparison_ops = [
-            _greater_than, _greater_than,
-            _less_than_or_equal, _less_than_or_equal]
-
-    bb_out = [op(x, y) for op, x, y in zip(comparison_ops, bb1, bb2)]
-    return bb_out
+        return [
+            max(bb1[0], bb2[0]), max(bb1[1], bb2[1]),
+            min(bb1[2], bb2[2]), min(bb1[3], bb2[3])]
+    raise ValueError(
+        "Unknown bounding box merge mode %s, expected 'union' or "
+        "'intersection'" % mode)
 
 
 def _make_logger_callback(message):
@@ -2714,48 +3004,18 @@ def _make_logger_callback(message):
 
 def _is_raster_path_band_formatted(raster_path_band):
     """Return true if raster path band is a (str, int) tuple/list."""
-    if not isinstance(raster_path_band, (list, tuple)):
-        return False
-    elif len(raster_path_band) != 2:
-        return False
-    elif not isinstance(raster_path_band[0], basestring):
-        return False
-    elif not isinstance(raster_path_band[1], int):
-        return False
-    else:
-        return True
-
-
-def _make_fft_cache():
-    """Create a helper function to remember the last computed fft."""
-    def _fft_cache(fshape, xoff, yoff, data_block):
-        """Remember the last computed fft.
-
-        Parameters:
-            fshape (numpy.ndarray): shape of fft
-            xoff,yoff (int): offsets of the data block
-            data_block (numpy.ndarray): the 2D array to calculate the FFT
-                on if not already calculated.
-
-        Returns:
-            fft transformed data_block of fshape size.
-
-        """
-        cache_key = (fshape[0], fshape[1], xoff, yoff)
-        if cache_key != _fft_cache.key:
-            _fft_cache.cache = numpy.fft.rfftn(data_block, fshape)
-            _fft_cache.key = cache_key
-        return _fft_cache.cache
-
-    _fft_cache.cache = None
-    _fft_cache.key = None
-    return _fft_cache
+    return (
+        isinstance(raster_path_band, (list, tuple)) and
+        len(raster_path_band) == 2 and
+        isinstance(raster_path_band[0], basestring) and
+        isinstance(raster_path_band[1], int))
 
 
 def _convolve_2d_worker(
         signal_path_band, kernel_path_band,
-        ignore_nodata, normalize_kernel,
-        work_queue, write_queue):
+        ignore_nodata, normalize_kernel, kernel_sum, kernel_offset_list,
+        n_fft_threads, kernel_fft_cache_bytes, work_queue, write_queue,
+        free_slot_queue, result_slot_list, mask_slot_list):
     """Worker function to be used by `convolve_2d`.
 
     Parameters:
@@ -2769,16 +3029,29 @@ def _convolve_2d_worker(
             the convolution filter.
         normalize_kernel (boolean): If true, the result is divided by the
             sum of the kernel.
-        work_queue (Queue): will contain (signal_offset, kernel_offset)
-            tuples that can be used to read raster blocks directly using
-            GDAL ReadAsArray(**offset). Indicates the block to operate on.
+        kernel_sum (float): sum of the kernel as calculated by
+            `_calculate_kernel_sum`, only used if `normalize_kernel` is True.
+        kernel_offset_list (list): offsets of every kernel block that can be
+            used to read them directly using GDAL ReadAsArray(**offset).
+        n_fft_threads (int): number of threads each FFT may use if the FFT
+            library supports threading.
+        kernel_fft_cache_bytes (int): most bytes of kernel block FFTs this
+            worker keeps between signal blocks.
+        work_queue (Queue): will contain signal offsets that can be used to
+            read raster blocks directly using GDAL ReadAsArray(**offset).
+            Indicates the signal block to convolve with every kernel block.
         write_queue (Queue): mechanism to pass result back to the writer
-            contains a (index_dict, result, mask_result,
-                 left_index_raster, right_index_raster,
-                 top_index_raster, bottom_index_raster,
-                 left_index_result, right_index_result,
-                 top_index_result, bottom_index_result) tuple that's used
-            for writing and masking.
+            contains a (index_dict, slot_index) tuple where `index_dict`
+            is the window of the target raster to add the result to and
+            `slot_index` indexes the slot in `result_slot_list` and
+            `mask_slot_list` that holds that result.
+        free_slot_queue (Queue): contains the indexes of slots that the
+            writer is done with and can be written to.
+        result_slot_list (list): list of `multiprocessing.RawArray`s that
+            the clipped convolution results are written to.
+        mask_slot_list (list): list of `multiprocessing.RawArray`s that the
+            clipped nodata mask convolutions are written to, None if
+            nodata is not being ignored.
 
     Returns:
         None
@@ -2797,126 +3070,502 @@ def _convolve_2d_worker(
     signal_nodata = signal_raster_info['nodata'][0]
     kernel_nodata = kernel_raster_info['nodata'][0]
 
-    mask_result = None  # in case no mask is needed, variable is still defined
+    # every signal block is convolved with the same kernel blocks, so their
+    # FFTs are kept by (fft rows, fft cols, kernel xoff, kernel yoff). Every
+    # signal block visits the kernel blocks in the same order, so once the
+    # cache is full nothing is evicted: dropping an entry would only throw
+    # away one that's needed again before the new one, while the entries
+    # that are kept keep hitting for every signal block.
+    kernel_fft_cache = {}
+    kernel_fft_cache_size = 0
+    # the spectrum products are multiplied into these, keyed by FFT shape,
+    # rather than into a new complex array for every kernel block. There
+    # are at most four signal and four kernel block shapes so this stays
+    # small.
+    fft_product_buffer_cache = {}
+
+    fft_kwargs = {}
+    if _FFT_THREADS_KEYWORD is not None and n_fft_threads > 1:
+        fft_kwargs[_FFT_THREADS_KEYWORD] = n_fft_threads
+    if _HAS_PYFFTW:
+        # the plan cache is enabled in this process rather than at import
+        # since its culling thread doesn't survive a fork and could leave
+        # the cache's lock held in a forked child. The plan for each FFT
+        # shape is measured once and kept long enough to be reused between
+        # blocks.
+        pyfftw.interfaces.cache.enable()
+        pyfftw.interfaces.cache.set_keepalive_time(60.0)
+        fft_kwargs['planner_effort'] = 'FFTW_MEASURE'
+
+    while True:
+        signal_offset = work_queue.get()
+        if signal_offset is None:
+            break
+
+        # the signal block is read once and its FFT (and its nodata mask's)
+        # computed once per FFT shape, then multiplied with every kernel
+        # block; the results overlap and are added together by the writer
+        signal_block = None
+        signal_fft_lookup = {}
+        mask_fft_lookup = {}
+        # each kernel block's result lands on the raster at the signal
+        # block's window shifted by half the kernel and the kernel block's
+        # offset, so only the kernel block's part changes in the loop
+        signal_left = signal_offset['xoff'] - n_cols_kernel // 2
+        signal_top = signal_offset['yoff'] - n_rows_kernel // 2
+        for kernel_offset in kernel_offset_list:
+            left_index_raster = signal_left + kernel_offset['xoff']
+            right_index_raster = (
+                left_index_raster + signal_offset['win_xsize'] +
+                kernel_offset['win_xsize'] - 1)
+            top_index_raster = signal_top + kernel_offset['yoff']
+            bottom_index_raster = (
+                top_index_raster + signal_offset['win_ysize'] +
+                kernel_offset['win_ysize'] - 1)
+
+            # it's possible that the piece of the integrating kernel
+            # doesn't affect the final result, if so we should skip
+            if (right_index_raster < 0 or
+                    bottom_index_raster < 0 or
+                    left_index_raster > n_cols_signal or
+                    top_index_raster > n_rows_signal):
+                continue
+
+            if signal_block is None:
+                signal_block = signal_band.ReadAsArray(**signal_offset)
+                if signal_nodata is not None and ignore_nodata:
+                    # if we're ignoring nodata, we don't want to add it up
+                    # in the convolution, so we zero those values out
+                    signal_nodata_mask = _nodata_mask(
+                        signal_block, signal_nodata)
+                    signal_block[signal_nodata_mask] = 0.0
+
+            # determine the output convolve shape
+            shape = (
+                signal_block.shape[0] + kernel_offset['win_ysize'] - 1,
+                signal_block.shape[1] + kernel_offset['win_xsize'] - 1)
+
+            # add zero padding so FFT is fast
+            fshape = (_next_regular(shape[0]), _next_regular(shape[1]))
+
+            if fshape not in signal_fft_lookup:
+                # float64 so scipy.fft keeps the precision numpy.fft had
+                signal_fft_lookup[fshape] = _FFT.rfftn(
+                    numpy.asarray(signal_block, dtype=numpy.float64), fshape,
+                    **fft_kwargs)
+            signal_fft = signal_fft_lookup[fshape]
+
+            kernel_fft_key = (
+                fshape[0], fshape[1], kernel_offset['xoff'],
+                kernel_offset['yoff'])
+            kernel_fft = kernel_fft_cache.get(kernel_fft_key)
+            if kernel_fft is None:
+                # the kernel block is only read and prepared on a cache miss
+                kernel_block = kernel_band.ReadAsArray(**kernel_offset)
+                if kernel_nodata is not None and ignore_nodata:
+                    kernel_block[
+                        _nodata_mask(kernel_block, kernel_nodata)] = 0.0
+                if normalize_kernel:
+                    kernel_block /= kernel_sum
+                kernel_fft = _FFT.rfftn(
+                    numpy.asarray(kernel_block, dtype=numpy.float64), fshape,
+                    **fft_kwargs)
+                kernel_block = None
+                if (kernel_fft_cache_size + kernel_fft.nbytes <=
+                        kernel_fft_cache_bytes):
+                    kernel_fft_cache[kernel_fft_key] = kernel_fft
+                    kernel_fft_cache_size += kernel_fft.nbytes
+
+            if fshape not in fft_product_buffer_cache:
+                fft_product_buffer_cache[fshape] = numpy.empty(
+                    kernel_fft.shape, dtype=kernel_fft.dtype)
+            fft_product = fft_product_buffer_cache[fshape]
+
+            # this variable determines the output slice that doesn't include
+            # the padded array region made for fast FFTs.
+            fslice = (slice(0, shape[0]), slice(0, shape[1]))
+            # classic FFT convolution
+            result = _FFT.irfftn(
+                numpy.multiply(signal_fft, kernel_fft, out=fft_product),
+                fshape, **fft_kwargs)[fslice]
+
+            # if we're ignoring nodata, we need to make a convolution of the
+            # nodata mask too
+            if signal_nodata is not None and ignore_nodata:
+                if fshape not in mask_fft_lookup:
+                    # the valid mask is passed as uint8 and only becomes
+                    # floating point inside the FFT
+                    mask_fft_lookup[fshape] = _FFT.rfftn(
+                        numpy.logical_not(signal_nodata_mask).view(
+                            numpy.uint8), fshape, **fft_kwargs)
+                mask_result = _FFT.irfftn(
+                    numpy.multiply(
+                        mask_fft_lookup[fshape], kernel_fft,
+                        out=fft_product),
+                    fshape, **fft_kwargs)[fslice]
+
+            # we might abut the edge of the raster, clip if so
+            left_index_result = max(0, -left_index_raster)
+            top_index_result = max(0, -top_index_raster)
+            right_index_result = result.shape[1] - max(
+                0, right_index_raster - n_cols_signal)
+            bottom_index_result = result.shape[0] - max(
+                0, bottom_index_raster - n_rows_signal)
+            left_index_raster = max(0, left_index_raster)
+            top_index_raster = max(0, top_index_raster)
+            right_index_raster = min(right_index_raster, n_cols_signal)
+            bottom_index_raster = min(bottom_index_raster, n_rows_signal)
+
+            # Add result to current output to account for overlapping edges
+            index_dict = {
+                'xoff': left_index_raster,
+                'yoff': top_index_raster,
+                'win_xsize': right_index_raster-left_index_raster,
+                'win_ysize': bottom_index_raster-top_index_raster
+            }
+
+            result_shape = (
+                index_dict['win_ysize'], index_dict['win_xsize'])
+            slot_index = free_slot_queue.get()
+            _shared_slot_as_array(
+                result_slot_list[slot_index], result_shape)[:] = (
+                    result[top_index_result:bottom_index_result,
+                           left_index_result:right_index_result])
+            if mask_slot_list is not None:
+                _shared_slot_as_array(
+                    mask_slot_list[slot_index], result_shape)[:] = (
+                        mask_result[top_index_result:bottom_index_result,
+                                    left_index_result:right_index_result])
+            write_queue.put((index_dict, slot_index))
+
+    # Indicates worker has terminated
+    write_queue.put(None)
+
+
+def _reproject_vector_by_feature(
+        base_vector_path, target_wkt, target_path, layer_index,
+        driver_name):
+    """Reproject a vector layer one feature at a time.
+
+    This is used by `reproject_vector` when `gdal.VectorTranslate` is not
+    available.
+
+    Parameters:
+        base_vector_path (string): Path to the base shapefile to transform.
+        target_wkt (string): the desired output projection in Well Known Text
+        target_path (string): the filepath to the transformed shapefile, which
+            must not already exist.
+        layer_index (int): index of layer in `base_vector_path` to reproject.
+        driver_name (string): String to pass to ogr.GetDriverByName.
+
+    Returns:
+        None
+
+    """
+    base_vector = gdal.OpenEx(base_vector_path)
+
+    target_sr = osr.SpatialReference(target_wkt)
+
+    # create a new shapefile from the orginal_datasource
+    target_driver = ogr.GetDriverByName(driver_name)
+    target_vector = target_driver.CreateDataSource(target_path)
+
+    layer = base_vector.GetLayer(layer_index)
+    layer_dfn = layer.GetLayerDefn()
+
+    # Create new layer for target_vector using same name and
+    # geometry type from base vector but new projection
+    target_layer = target_vector.CreateLayer(
+        layer_dfn.GetName(), target_sr, layer_dfn.GetGeomType())
+
+    # Get the number of fields in original_layer
+    original_field_count = layer_dfn.GetFieldCount()
+
+    # For every field, create a duplicate field in the new layer
+    for fld_index in range(original_field_count):
+        original_field = layer_dfn.GetFieldDefn(fld_index)
+        target_field = ogr.FieldDefn(
+            original_field.GetName(), original_field.GetType())
+        target_layer.CreateField(target_field)
+
+    # Get the SR of the original_layer to use in transforming
+    base_sr = layer.GetSpatialRef()
+
+    # Create a coordinate transformation
+    coord_trans = _get_coordinate_transformation(
+        base_sr.ExportToWkt(), target_wkt)
+
+    # a single target feature is reused for every base feature since
+    # `CreateFeature` copies it into the layer
+    target_feature = ogr.Feature(target_layer.GetLayerDefn())
+
+    # Copy all of the features in layer to the new shapefile
+    error_count = 0
+    for base_feature in layer:
+        geom = base_feature.GetGeometryRef()
+        if geom is None:
+            # we encountered this error occasionally when transforming clipped
+            # global polygons.  Not clear what is happening but perhaps a
+            # feature was retained that otherwise wouldn't have been included
+            # in the clip
+            error_count += 1
+            continue
+
+        # Transform geometry into format desired for the new projection
+        error_code = geom.Transform(coord_trans)
+        if error_code != 0:  # error
+            # this could be caused by an out of range transformation
+            # whatever the case, don't put the transformed poly into the
+            # output set
+            error_count += 1
+            continue
+
+        # Copy the fields and the now transformed geometry of the base
+        # feature in one call; the FID is cleared because `CreateFeature`
+        # sets it on the reused feature
+        target_feature.SetFrom(base_feature)
+        target_feature.SetFID(ogr.NullFID)
+
+        target_layer.CreateFeature(target_feature)
+        base_feature = None
+    target_feature = None
+    if error_count > 0:
+        LOGGER.warn(
+            '%d features out of %d were unable to be transformed and are'
+            ' not in the output vector at %s', error_count,
+            layer.GetFeatureCount(), target_path)
+    layer = None
+    base_vector = None
+
+
+def _get_coordinate_transformation(base_wkt, target_wkt):
+    """Get a cached coordinate transformation between two references.
+
+    Parameters:
+        base_wkt (string): spatial reference of the source coordinates in
+            Well Known Text.
+        target_wkt (string): spatial reference of the transformed coordinates
+            in Well Known Text.
+
+    Returns:
+        osr.CoordinateTransformation from `base_wkt` to `target_wkt` that is
+        shared with other callers in the current thread requesting the same
+        pair.
+
+    """
+    try:
+        transformation_cache = _COORDINATE_TRANSFORMATION_CACHE.cache
+    except AttributeError:
+        transformation_cache = {}
+        _COORDINATE_TRANSFORMATION_CACHE.cache = transformation_cache
+    cache_key = (base_wkt, target_wkt)
+    if cache_key not in transformation_cache:
+        if (len(transformation_cache) >=
+                _MAX_COORDINATE_TRANSFORMATION_CACHE_SIZE):
+            transformation_cache.clear()
+        base_ref = osr.SpatialReference()
+        base_ref.ImportFromWkt(base_wkt)
+        target_ref = osr.SpatialReference()
+        target_ref.ImportFromWkt(target_wkt)
+        transformation_cache[cache_key] = (
+            osr.CoordinateTransformation(base_ref, target_ref))
+    return transformation_cache[cache_key]
+
+
+def _calculate_kernel_sum(kernel_path_band, ignore_nodata):
+    """Sum the pixels of a kernel raster band.
+
+    Parameters:
+        kernel_path_band (tuple): a 2 tuple of the form
+            (filepath to kernel raster, band index).
+        ignore_nodata (boolean): if True, pixels that are close to the
+            kernel's nodata value are treated as 0.0.
 
-    _signal_fft_cache = _make_fft_cache()
-    _kernel_fft_cache = _make_fft_cache()
-    _mask_fft_cache = _make_fft_cache()
+    Returns:
+        sum of the kernel as a float.
 
-    # calculate the kernel sum for normalization
+    """
+    kernel_nodata = get_raster_info(kernel_path_band[0])['nodata'][
+        kernel_path_band[1]-1]
     kernel_sum = 0.0
-    for _, kernel_block in iterblocks(kernel_path_band[0]):
+    for _, kernel_block in iterblocks(
+            kernel_path_band[0], band_index_list=[kernel_path_band[1]]):
         if kernel_nodata is not None and ignore_nodata:
-            kernel_block[numpy.isclose(kernel_block, kernel_nodata)] = 0.0
-        kernel_sum += numpy.sum(kernel_block)
+            numpy.putmask(
+                kernel_block, _nodata_mask(kernel_block, kernel_nodata),
+                0.0)
+        kernel_sum += kernel_block.sum(dtype=numpy.float64)
+    return kernel_sum
 
-    while True:
-        payload = work_queue.get()
-        if payload is None:
-            break
 
-        signal_offset, kernel_offset = payload
-
-        signal_block = signal_band.ReadAsArray(**signal_offset)
-        kernel_block = kernel_band.ReadAsArray(**kernel_offset)
-
-        if signal_nodata is not None and ignore_nodata:
-            # if we're ignoring nodata, we don't want to add it up in the
-            # convolution, so we zero those values out
-            signal_nodata_mask = numpy.isclose(signal_block, signal_nodata)
-            signal_block[signal_nodata_mask] = 0.0
-
-        left_index_raster = (
-            signal_offset['xoff'] - n_cols_kernel // 2 + kernel_offset['xoff'])
-        right_index_raster = (
-            signal_offset['xoff'] - n_cols_kernel // 2 +
-            kernel_offset['xoff'] + signal_offset['win_xsize'] +
-            kernel_offset['win_xsize'] - 1)
-        top_index_raster = (
-            signal_offset['yoff'] - n_rows_kernel // 2 + kernel_offset['yoff'])
-        bottom_index_raster = (
-            signal_offset['yoff'] - n_rows_kernel // 2 +
-            kernel_offset['yoff'] + signal_offset['win_ysize'] +
-            kernel_offset['win_ysize'] - 1)
-
-        # it's possible that the piece of the integrating kernel
-        # doesn't affect the final result, if so we should skip
-        if (right_index_raster < 0 or
-                bottom_index_raster < 0 or
-                left_index_raster > n_cols_signal or
-                top_index_raster > n_rows_signal):
+def _nodata_mask(array, nodata):
+    """Return a boolean mask of where `array` is `nodata`.
+
+    Float arrays are matched with `numpy.isclose`'s default tolerance, or
+    with `numpy.isnan` if `nodata` is NaN, in one pass with a single
+    temporary. Integer arrays are matched exactly.
+
+    Parameters:
+        array (numpy.ndarray): array to test.
+        nodata (numeric): nodata value to look for in `array`.
+
+    Returns:
+        boolean numpy.ndarray the same shape as `array`.
+
+    """
+    if not numpy.issubdtype(array.dtype, numpy.floating):
+        return array == nodata
+    if numpy.isnan(nodata):
+        return numpy.isnan(array)
+    if numpy.isinf(nodata):
+        return array == nodata
+    difference = numpy.subtract(array, nodata)
+    numpy.abs(difference, out=difference)
+    return difference <= 1e-8 + 1e-5 * abs(nodata)
+
+
+def _shared_slot_as_array(shared_slot, shape):
+    """View the front of a shared memory slot as a float64 array.
+
+    Parameters:
+        shared_slot (multiprocessing.RawArray): a 'd' typed shared array with
+            at least shape[0]*shape[1] elements.
+        shape (tuple): the (rows, cols) shape of the array to view.
+
+    Returns:
+        a numpy.float64 array of `shape` that shares memory with
+        `shared_slot`.
+
+    """
+    return numpy.frombuffer(
+        shared_slot, dtype=numpy.float64,
+        count=shape[0]*shape[1]).reshape(shape)
+
+
+def _get_dataset_file_list(dataset, path):
+    """List the files on disk that make up an open GDAL dataset.
+
+    Parameters:
+        dataset (gdal.Dataset): an open raster or vector.
+        path (string): the path `dataset` was opened from.
+
+    Returns:
+        list of absolute paths of the files GDAL read `dataset` from, such
+        as a world file, ENVI header or shapefile .dbf, plus the
+        `.aux.xml` sidecar GDAL may later write metadata such as nodata
+        values to whether or not it exists yet.
+
+    """
+    file_list = dataset.GetFileList() or [path]
+    file_list = [os.path.abspath(file_path) for file_path in file_list]
+    aux_path = os.path.abspath(path) + '.aux.xml'
+    if aux_path not in file_list:
+        file_list.append(aux_path)
+    return file_list
+
+
+def _get_file_signature(path_list):
+    """Identify the current version of a set of files on disk.
+
+    Parameters:
+        path_list (list): paths to files or directories, some of which may
+            not exist.
+
+    Returns:
+        a tuple with one entry per path in `path_list` of its inode, size,
+        modification time and change time, or None if it doesn't exist.
+
+    """
+    signature = []
+    for path in path_list:
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            signature.append(None)
             continue
+        # nanosecond timestamps are only available on Python 3
+        signature.append((
+            file_stat.st_ino, file_stat.st_size,
+            getattr(file_stat, 'st_mtime_ns', file_stat.st_mtime),
+            getattr(file_stat, 'st_ctime_ns', file_stat.st_ctime)))
+    return tuple(signature)
 
-        if kernel_nodata is not None and ignore_nodata:
-            kernel_block[numpy.isclose(kernel_block, kernel_nodata)] = 0.0
-
-        if normalize_kernel:
-            kernel_block /= kernel_sum
-
-        # determine the output convolve shape
-        shape = (
-            numpy.array(signal_block.shape) +
-            numpy.array(kernel_block.shape) - 1)
-
-        # add zero padding so FFT is fast
-        fshape = [_next_regular(int(d)) for d in shape]
-
-        signal_fft = _signal_fft_cache(
-            fshape, signal_offset['xoff'], signal_offset['yoff'],
-            signal_block)
-        kernel_fft = _kernel_fft_cache(
-            fshape, kernel_offset['xoff'], kernel_offset['yoff'],
-            kernel_block)
-
-        # this variable determines the output slice that doesn't include
-        # the padded array region made for fast FFTs.
-        fslice = tuple([slice(0, int(sz)) for sz in shape])
-        # classic FFT convolution
-        result = numpy.fft.irfftn(signal_fft * kernel_fft, fshape)[fslice]
-
-        # if we're ignoring nodata, we need to make a convolution of the
-        # nodata mask too
-        if signal_nodata is not None and ignore_nodata:
-            mask_fft = _mask_fft_cache(
-                fshape, signal_offset['xoff'], signal_offset['yoff'],
-                numpy.where(signal_nodata_mask, 0.0, 1.0))
-            mask_result = numpy.fft.irfftn(
-                mask_fft * kernel_fft, fshape)[fslice]
-
-        left_index_result = 0
-        right_index_result = result.shape[1]
-        top_index_result = 0
-        bottom_index_result = result.shape[0]
-
-        # we might abut the edge of the raster, clip if so
-        if left_index_raster < 0:
-            left_index_result = -left_index_raster
-            left_index_raster = 0
-        if top_index_raster < 0:
-            top_index_result = -top_index_raster
-            top_index_raster = 0
-        if right_index_raster > n_cols_signal:
-            right_index_result -= right_index_raster - n_cols_signal
-            right_index_raster = n_cols_signal
-        if bottom_index_raster > n_rows_signal:
-            bottom_index_result -= (
-                bottom_index_raster - n_rows_signal)
-            bottom_index_raster = n_rows_signal
-
-        # Add result to current output to account for overlapping edges
-        index_dict = {
-            'xoff': left_index_raster,
-            'yoff': top_index_raster,
-            'win_xsize': right_index_raster-left_index_raster,
-            'win_ysize': bottom_index_raster-top_index_raster
-        }
 
-        write_queue.put(
-            (index_dict, result, mask_result,
-             left_index_raster, right_index_raster,
-             top_index_raster, bottom_index_raster,
-             left_index_result, right_index_result,
-             top_index_result, bottom_index_result))
+def _is_integral_array(array):
+    """Test if every element of a numeric array is a finite integer.
 
-    # Indicates worker has terminated
-    write_queue.put(None)
+    Parameters:
+        array (numpy.ndarray): array to test.
+
+    Returns:
+        True if `array` has an integer type or is a floating point array
+        holding only finite whole numbers, False otherwise.
+
+    """
+    if array.dtype.kind in 'iu':
+        return True
+    return bool(
+        array.dtype.kind == 'f' and numpy.all(numpy.isfinite(array)) and
+        numpy.all(array == numpy.floor(array)))
+
+
+def _reclassify_raster_by_lut(
+        base_raster_path_band, keys, values, target_raster_path,
+        target_datatype, target_nodata):
+    """Reclassify an integer raster through a GDAL VRT lookup table.
+
+    The lookup table steps between keys so each pixel gets the value of
+    the smallest key greater than or equal to it, which is the same
+    mapping `reclassify_raster` makes with `numpy.digitize`.
+
+    Parameters:
+        base_raster_path_band (tuple): a (path, band_index) tuple of an
+            integer raster to reclassify.
+        keys (numpy.ndarray): sorted 1D array of integer keys.
+        values (numpy.ndarray): 1D array of the integer values to map
+            `keys` to.
+        target_raster_path (string): path to the target GeoTIFF.
+        target_datatype (gdal type): an integer GDAL type for the target.
+        target_nodata (numerical type): nodata value for the target.
+
+    Returns:
+        None
+
+    """
+    lut_list = ['%d:%d' % (keys[0], values[0])]
+    for index in range(1, keys.size):
+        # integer pixels between two keys map to the upper key's value
+        if keys[index] - keys[index-1] > 1:
+            lut_list.append('%d:%d' % (keys[index-1] + 1, values[index]))
+        lut_list.append('%d:%d' % (keys[index], values[index]))
+
+    raster_info = get_raster_info(base_raster_path_band[0])
+    vrt_raster = gdal.GetDriverByName('VRT').Create(
+        '', raster_info['raster_size'][0], raster_info['raster_size'][1], 0)
+    vrt_raster.SetGeoTransform(raster_info['geotransform'])
+    vrt_raster.SetProjection(raster_info['projection'])
+    vrt_raster.AddBand(target_datatype)
+    vrt_band = vrt_raster.GetRasterBand(1)
+    if target_nodata is not None:
+        vrt_band.SetNoDataValue(target_nodata)
+    vrt_band.SetMetadataItem(
+        'source_0',
+        '<ComplexSource>'
+        '<SourceFilename relativeToVRT="0">%s</SourceFilename>'
+        '<SourceBand>%d</SourceBand>'
+        '<LUT>%s</LUT>'
+        '</ComplexSource>' % (
+            xml.sax.saxutils.escape(
+                os.path.abspath(base_raster_path_band[0])),
+            base_raster_path_band[1], ','.join(lut_list)),
+        'new_vrt_sources')
+    vrt_band = None
+
+    gdal.Translate(
+        target_raster_path, vrt_raster, format='GTiff',
+        creationOptions=DEFAULT_GTIFF_CREATION_OPTIONS,
+        callback=_make_logger_callback(
+            "reclassify_raster %.1f%% complete %s"),
+        callback_data=[target_raster_path])
+    vrt_raster = None
+    calculate_raster_stats(target_raster_path)
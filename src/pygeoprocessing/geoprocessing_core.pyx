@@ -9,6 +9,8 @@ cimport numpy
 import numpy
 cimport cython
 from libcpp.map cimport map
+from libcpp.unordered_map cimport unordered_map
+from cython.operator cimport dereference
 
 from libc.math cimport sqrt
 from libc.math cimport exp
@@ -534,3 +536,51 @@ def stats_worker(stats_work_queue, exception_queue):
         while not stats_work_queue.empty():
             stats_work_queue.get()
         raise
+
+
+cdef class IntKeyLookup:
+    """Hash table from integer keys to their index in a key array.
+
+    Used by `reclassify_raster` for integer keys that are too sparse for a
+    dense lookup table but too many to binary search efficiently.
+    """
+    cdef unordered_map[numpy.int64_t, numpy.int64_t] key_index_map
+
+    def __init__(self, numpy.ndarray[numpy.int64_t, ndim=1] key_array):
+        """Build the hash table.
+
+        Parameters:
+            key_array (numpy.ndarray): 1D int64 array of unique keys.
+
+        """
+        cdef numpy.int64_t index
+        self.key_index_map.reserve(key_array.shape[0])
+        for index in range(key_array.shape[0]):
+            self.key_index_map[key_array[index]] = index
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def lookup(self, numpy.ndarray[numpy.int64_t, ndim=1] value_array):
+        """Find the index of the key that matches each value.
+
+        Parameters:
+            value_array (numpy.ndarray): 1D int64 array of values to look up.
+
+        Returns:
+            1D int64 array the same size as `value_array` with the index
+            in the key array of each value, or -1 where a value is not a
+            key.
+
+        """
+        cdef numpy.int64_t i
+        cdef numpy.int64_t n_values = value_array.shape[0]
+        cdef numpy.ndarray[numpy.int64_t, ndim=1] index_array = numpy.empty(
+            n_values, dtype=numpy.int64)
+        cdef unordered_map[numpy.int64_t, numpy.int64_t].iterator key_index
+        for i in range(n_values):
+            key_index = self.key_index_map.find(value_array[i])
+            if key_index == self.key_index_map.end():
+                index_array[i] = -1
+            else:
+                index_array[i] = dereference(key_index).second
+        return index_array
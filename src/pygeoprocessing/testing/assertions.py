@@ -170,19 +170,25 @@ def assert_rasters_equal(
             for (_, a_block), (_, b_block) in zip(
                     geoprocessing.iterblocks(a_uri, [band_number]),
                     geoprocessing.iterblocks(b_uri, [band_number])):
+                if numpy.array_equal(a_block, b_block):
+                    # identical blocks are equal at any tolerance
+                    continue
                 try:
                     numpy.testing.assert_allclose(
                         a_block, b_block, rtol=rel_tol, atol=abs_tol)
                 except AssertionError:
-                    iterator = numpy.nditer([a_block, b_block],
-                                            flags=['multi_index'],
-                                            op_flags=['readonly'])
-                    while not iterator.finished:
-                        col = iterator.multi_index[0]
-                        row = iterator.multi_index[1]
-
-                        pixel_a = a_block[iterator.multi_index]
-                        pixel_b = b_block[iterator.multi_index]
+                    # only the pixels that fail the same test `isclose`
+                    # makes need to be checked one at a time for the message
+                    a_float_block = a_block.astype(numpy.float64)
+                    b_float_block = b_block.astype(numpy.float64)
+                    close_mask = (
+                        numpy.abs(a_float_block - b_float_block) <=
+                        numpy.maximum(rel_tol * numpy.maximum(
+                            numpy.abs(a_float_block),
+                            numpy.abs(b_float_block)), abs_tol))
+                    for col, row in numpy.argwhere(~close_mask):
+                        pixel_a = a_block[col, row]
+                        pixel_b = b_block[col, row]
                         assert_close(
                             pixel_a, pixel_b, rel_tol=rel_tol,
                             abs_tol=abs_tol, msg=(
@@ -192,7 +198,6 @@ def assert_rasters_equal(
                                     a_val=pixel_a, b_val=pixel_b, col=col,
                                     row=row, rel_tol=rel_tol,
                                     abs_tol=abs_tol))
-                        iterator.iternext()
     finally:
         gdal.Dataset.__swig_destroy__(a_dataset)
         gdal.Dataset.__swig_destroy__(b_dataset)
@@ -474,8 +479,10 @@ def assert_json_equal(json_1_uri, json_2_uri):
     Returns:
         None
     """
-    dict_1 = json.loads(open(json_1_uri).read())
-    dict_2 = json.loads(open(json_2_uri).read())
+    with open(json_1_uri) as json_1_file:
+        dict_1 = json.load(json_1_file)
+    with open(json_2_uri) as json_2_file:
+        dict_2 = json.load(json_2_file)
 
     if dict_1 != dict_2:
         raise AssertionError('JSON objects differ: %s\n%s' % (dict_1, dict_2))
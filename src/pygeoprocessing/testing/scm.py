@@ -69,7 +69,8 @@ def load_config(config_file):
     }
     """
 
-    data = json.load(open(config_file))
+    with open(config_file) as opened_config_file:
+        data = json.load(opened_config_file)
     if not os.path.isabs(data['local']):
         # assume that the data path is relative to the configuration file.
         config_file_dir = os.path.dirname(config_file)
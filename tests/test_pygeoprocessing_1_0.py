@@ -138,6 +138,112 @@ class PyGeoprocessing10(unittest.TestCase):
         self.assertEqual(
             numpy.sum(target_array), n_pixels**2 * value_map[test_value])
 
+    def test_reclassify_raster_int(self):
+        """PGP.geoprocessing: test reclassify raster with integer keys."""
+        reference = sampledata.SRS_COLOMBIA
+        n_pixels = 9
+        pixel_matrix = numpy.zeros((n_pixels, n_pixels), numpy.int16)
+        pixel_matrix[0:3, :] = 3
+        pixel_matrix[3:6, :] = 7
+        nodata_target = -1
+        pixel_matrix[-1, -1] = nodata_target
+        raster_path = os.path.join(self.workspace_dir, 'raster.tif')
+        target_path = os.path.join(self.workspace_dir, 'target.tif')
+        pygeoprocessing.testing.create_raster_on_disk(
+            [pixel_matrix], reference.origin, reference.projection,
+            nodata_target, reference.pixel_size(30), filename=raster_path)
+
+        value_map = {
+            0: 10,
+            3: 30,
+            7: 70,
+        }
+        target_nodata = -5
+        pygeoprocessing.reclassify_raster(
+            (raster_path, 1), value_map, target_path, gdal.GDT_Int32,
+            target_nodata, values_required=True)
+        target_raster = gdal.Open(target_path)
+        target_band = target_raster.GetRasterBand(1)
+        target_array = target_band.ReadAsArray()
+        target_band = None
+        target_raster = None
+        expected_array = numpy.empty(pixel_matrix.shape, dtype=numpy.int32)
+        expected_array[:] = 10
+        expected_array[0:3, :] = 30
+        expected_array[3:6, :] = 70
+        expected_array[-1, -1] = target_nodata
+        numpy.testing.assert_array_equal(target_array, expected_array)
+
+        del value_map[3]
+        with self.assertRaises(ValueError) as cm:
+            pygeoprocessing.reclassify_raster(
+                (raster_path, 1), value_map, target_path, gdal.GDT_Int32,
+                target_nodata, values_required=True)
+        expected_message = (
+            'The following 1 raster values [3] from "%s" do not have ' %
+            (raster_path,))
+        actual_message = str(cm.exception)
+        self.assertTrue(expected_message in actual_message, actual_message)
+
+    def test_reclassify_raster_int_not_required(self):
+        """PGP.geoprocessing: test small int reclassify, values optional."""
+        reference = sampledata.SRS_COLOMBIA
+        pixel_matrix = numpy.array(
+            [[0, 1, 2], [3, 4, 5], [5, 1, -1]], dtype=numpy.int16)
+        nodata_target = -1
+        raster_path = os.path.join(self.workspace_dir, 'raster.tif')
+        target_path = os.path.join(self.workspace_dir, 'target.tif')
+        pygeoprocessing.testing.create_raster_on_disk(
+            [pixel_matrix], reference.origin, reference.projection,
+            nodata_target, reference.pixel_size(30), filename=raster_path)
+
+        value_map = {
+            1: 10,
+            5: 50,
+        }
+        target_nodata = -5
+        pygeoprocessing.reclassify_raster(
+            (raster_path, 1), value_map, target_path, gdal.GDT_Int32,
+            target_nodata, values_required=False)
+        target_raster = gdal.Open(target_path)
+        target_band = target_raster.GetRasterBand(1)
+        target_array = target_band.ReadAsArray()
+        self.assertEqual(target_band.GetNoDataValue(), target_nodata)
+        target_band = None
+        target_raster = None
+        # values that aren't keys take the value of the next larger key
+        expected_array = numpy.array(
+            [[10, 10, 50], [50, 50, 50], [50, 10, target_nodata]])
+        numpy.testing.assert_array_equal(target_array, expected_array)
+
+    def test_reclassify_raster_sparse_int(self):
+        """PGP.geoprocessing: test reclassify raster with sparse int keys."""
+        reference = sampledata.SRS_COLOMBIA
+        # enough keys spread out far enough to not fit in a dense table
+        value_map = dict((key * 1000, key) for key in range(1100))
+        pixel_matrix = numpy.arange(100, dtype=numpy.int32).reshape(
+            (10, 10)) * 11000
+        nodata_target = -1
+        pixel_matrix[-1, -1] = nodata_target
+        raster_path = os.path.join(self.workspace_dir, 'raster.tif')
+        target_path = os.path.join(self.workspace_dir, 'target.tif')
+        pygeoprocessing.testing.create_raster_on_disk(
+            [pixel_matrix], reference.origin, reference.projection,
+            nodata_target, reference.pixel_size(30), filename=raster_path)
+
+        target_nodata = -5
+        pygeoprocessing.reclassify_raster(
+            (raster_path, 1), value_map, target_path, gdal.GDT_Int32,
+            target_nodata, values_required=True)
+        target_raster = gdal.Open(target_path)
+        target_band = target_raster.GetRasterBand(1)
+        target_array = target_band.ReadAsArray()
+        target_band = None
+        target_raster = None
+        expected_array = pixel_matrix // 1000
+        expected_array[-1, -1] = target_nodata
+        numpy.testing.assert_array_equal(target_array, expected_array)
+
     def test_reclassify_raster_no_raster_path_band(self):
         """PGP.geoprocessing: test reclassify raster is path band aware."""
         reference = sampledata.SRS_COLOMBIA
@@ -2172,6 +2278,110 @@ class PyGeoprocessing10(unittest.TestCase):
         actual_message = str(cm.exception)
         self.assertTrue(expected_message in actual_message, actual_message)
 
+    def test_get_raster_info_cache(self):
+        """PGP: test get_raster_info results track changes to the raster."""
+        reference = sampledata.SRS_COLOMBIA
+        pixel_matrix = numpy.ones((5, 5), numpy.int16)
+        raster_path = os.path.join(self.workspace_dir, 'raster.tif')
+        pygeoprocessing.testing.create_raster_on_disk(
+            [pixel_matrix], reference.origin, reference.projection,
+            -1, reference.pixel_size(30), filename=raster_path)
+        # backdate the raster so the write below changes its modification
+        # time no matter how coarse the filesystem's timestamps are
+        old_time = time.time() - 60.0
+        os.utime(raster_path, (old_time, old_time))
+
+        raster_info = pygeoprocessing.get_raster_info(raster_path)
+        self.assertEqual(raster_info['nodata'], [-1])
+        # modifying a result should not change later results
+        raster_info['nodata'][0] = 99
+        # an unchanged raster is answered from the cache without opening it
+        with mock.patch('osgeo.gdal.OpenEx') as mock_open:
+            self.assertEqual(
+                pygeoprocessing.get_raster_info(raster_path)['nodata'],
+                [-1])
+        self.assertFalse(mock_open.called)
+
+        # a raster that was just written is always read again
+        raster = gdal.OpenEx(raster_path, gdal.OF_RASTER | gdal.GA_Update)
+        raster.GetRasterBand(1).SetNoDataValue(-2)
+        raster = None
+        self.assertEqual(
+            pygeoprocessing.get_raster_info(raster_path)['nodata'], [-2])
+
+    def test_get_raster_info_cache_sidecar(self):
+        """PGP: test get_raster_info results track a raster's header file."""
+        reference = sampledata.SRS_COLOMBIA
+        pixel_matrix = numpy.ones((5, 5), numpy.int16)
+        raster_path = os.path.join(self.workspace_dir, 'raster.img')
+        pygeoprocessing.testing.create_raster_on_disk(
+            [pixel_matrix], reference.origin, reference.projection,
+            -1, reference.pixel_size(30), format='ENVI', dataset_opts=[],
+            filename=raster_path)
+        header_path = os.path.join(self.workspace_dir, 'raster.hdr')
+        old_time = time.time() - 60.0
+        os.utime(header_path, (old_time, old_time))
+        self.assertEqual(
+            pygeoprocessing.get_raster_info(raster_path)['nodata'], [-1])
+
+        # ENVI keeps the nodata value in the header, so changing only the
+        # header must still invalidate the cached info
+        with open(header_path, 'r') as header_file:
+            header_lines = [
+                line for line in header_file
+                if not line.startswith('data ignore value')]
+        header_lines.append('data ignore value = -2\n')
+        with open(header_path, 'w') as header_file:
+            header_file.writelines(header_lines)
+        self.assertEqual(
+            pygeoprocessing.get_raster_info(raster_path)['nodata'], [-2])
+
+    def test_calculate_disjoint_polygon_set_empty(self):
+        """PGP.geoprocessing: test disjoint polygon set of an empty layer."""
+        reference = sampledata.SRS_COLOMBIA
+        vector_driver = ogr.GetDriverByName('ESRI Shapefile')
+        vector_path = os.path.join(self.workspace_dir, 'empty.shp')
+        vector = vector_driver.CreateDataSource(vector_path)
+        srs = osr.SpatialReference(reference.projection)
+        vector.CreateLayer('empty', srs=srs, geom_type=ogr.wkbPolygon)
+        vector.SyncToDisk()
+        vector = None
+
+        self.assertEqual(
+            pygeoprocessing.calculate_disjoint_polygon_set(vector_path), [])
+        # a second call may be answered from the cache
+        self.assertEqual(
+            pygeoprocessing.calculate_disjoint_polygon_set(vector_path), [])
+
+    def test_calculate_disjoint_polygon_set_cache(self):
+        """PGP.geoprocessing: test disjoint sets track every vector file."""
+        reference = sampledata.SRS_COLOMBIA
+        vector_driver = ogr.GetDriverByName('ESRI Shapefile')
+        vector_path = os.path.join(self.workspace_dir, 'empty.shp')
+        vector = vector_driver.CreateDataSource(vector_path)
+        srs = osr.SpatialReference(reference.projection)
+        vector.CreateLayer('empty', srs=srs, geom_type=ogr.wkbPolygon)
+        vector.SyncToDisk()
+        vector = None
+        self.assertEqual(
+            pygeoprocessing.calculate_disjoint_polygon_set(vector_path), [])
+
+        gdal_open = gdal.OpenEx
+        # an unchanged vector is answered from the cache without opening it
+        with mock.patch('osgeo.gdal.OpenEx', wraps=gdal_open) as mock_open:
+            pygeoprocessing.calculate_disjoint_polygon_set(vector_path)
+        self.assertFalse(mock_open.called)
+
+        # touching only the .dbf must invalidate the cached result
+        dbf_path = os.path.join(self.workspace_dir, 'empty.dbf')
+        new_time = time.time() + 60.0
+        os.utime(dbf_path, (new_time, new_time))
+        with mock.patch('osgeo.gdal.OpenEx', wraps=gdal_open) as mock_open:
+            self.assertEqual(
+                pygeoprocessing.calculate_disjoint_polygon_set(vector_path),
+                [])
+        self.assertTrue(mock_open.called)
+
     def test_get_vector_info_error_handling(self):
         """PGP: test that bad data raise good errors in get_vector_info."""
         # check for missing file